@@ -5,7 +5,6 @@ from pathlib import Path
 import logging
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
 
 # Add the project root directory to the Python path
 # Get the directory of the current file
@@ -37,7 +36,7 @@ from sqlmodel import SQLModel  # noqa
 # Then import all models, ensuring they are registered to SQLModel.metadata
 from app.models import User, Item  # noqa
 from app.core.config import settings  # noqa
-from app.core.db_factory import get_engine_args  # noqa
+from app.core.db_factory import get_engine, get_engine_args  # noqa
 
 target_metadata = SQLModel.metadata
 
@@ -127,32 +126,20 @@ def run_migrations_online():
     # Print database connection information
     print_db_info()
     
-    configuration = config.get_section(config.config_ini_section)
-    configuration["sqlalchemy.url"] = get_url()
-    
-    # Get database engine specific arguments
-    engine_args = get_engine_args()
-    
-    # Create engine - directly pass connect_args instead of through configuration
-    if engine_args and "connect_args" in engine_args:
-        connect_args = engine_args["connect_args"]
-    else:
-        connect_args = {}
-    
-    connectable = engine_from_config(
-        configuration,
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-        connect_args=connect_args,  # directly pass connect_args
-    )
-
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata, compare_type=True
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+    # Resolve the primary engine from the shared registry so migrations use the
+    # same URL, connect_args and pool settings as the application
+    connectable = get_engine()
+
+    try:
+        with connectable.connect() as connection:
+            context.configure(
+                connection=connection, target_metadata=target_metadata, compare_type=True
+            )
+
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        connectable.dispose()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,56 @@
+"""Add (owner_id, id) index on item for keyset pagination
+
+Revision ID: 5f3c2a8e71d4
+Revises: 1a31ce608336
+Create Date: 2026-10-17 09:12:41.508213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '5f3c2a8e71d4'
+down_revision = '1a31ce608336'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Build the index without blocking writes on large item tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_item_owner_id_id',
+            'item',
+            ['owner_id', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # owner_id is the leading column of the new index, which makes the
+        # single column one redundant
+        op.drop_index(
+            'ix_item_owner_id',
+            table_name='item',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_item_owner_id',
+            'item',
+            ['owner_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_item_owner_id_id',
+            table_name='item',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,41 @@
+"""Add item (created_at DESC, id DESC) index for global newest first listings
+
+Revision ID: a4e9d7c21f63
+Revises: f1a7c3e52b08
+Create Date: 2026-10-18 11:02:17.904386
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e9d7c21f63'
+down_revision = 'f1a7c3e52b08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built without blocking writes. The BRIN index only narrows time ranges,
+    # sort=-created_at without an owner filter needs the order from a B-tree.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_item_created_at_id',
+            'item',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_item_created_at_id',
+            table_name='item',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
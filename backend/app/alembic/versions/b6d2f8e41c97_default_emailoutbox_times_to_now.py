@@ -0,0 +1,28 @@
+"""Default emailoutbox created_at and next_attempt_at to now()
+
+Revision ID: b6d2f8e41c97
+Revises: a4e9d7c21f63
+Create Date: 2026-10-18 16:24:51.630284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2f8e41c97'
+down_revision = 'a4e9d7c21f63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Stamped by the database clock the outbox queries compare them with
+    op.alter_column('emailoutbox', 'created_at', server_default=sa.text('now()'))
+    op.alter_column('emailoutbox', 'next_attempt_at', server_default=sa.text('now()'))
+
+
+def downgrade():
+    op.alter_column('emailoutbox', 'next_attempt_at', server_default=None)
+    op.alter_column('emailoutbox', 'created_at', server_default=None)
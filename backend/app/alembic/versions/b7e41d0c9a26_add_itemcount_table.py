@@ -0,0 +1,37 @@
+"""Add itemcount table with per-owner item counters
+
+Revision ID: b7e41d0c9a26
+Revises: 5f3c2a8e71d4
+Create Date: 2026-10-17 11:03:27.914562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e41d0c9a26'
+down_revision = '5f3c2a8e71d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'itemcount',
+        sa.Column('owner_id', sa.Uuid(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('owner_id'),
+    )
+    # Seed the counters from the existing items
+    op.execute(
+        """
+        INSERT INTO itemcount (owner_id, count)
+        SELECT owner_id, count(*) FROM item GROUP BY owner_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('itemcount')
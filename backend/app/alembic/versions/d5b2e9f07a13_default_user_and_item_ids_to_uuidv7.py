@@ -0,0 +1,58 @@
+"""Default user and item ids to time-ordered UUIDv7
+
+Revision ID: d5b2e9f07a13
+Revises: c3d8f1a64e90
+Create Date: 2026-10-17 18:03:27.914530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b2e9f07a13'
+down_revision = 'c3d8f1a64e90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The application generates ids itself, this covers rows inserted with SQL.
+    # It overlays the millisecond timestamp on a random v4 id and flips the
+    # version nibble from 4 to 7. Existing v4 ids stay valid, ids are only
+    # compared as opaque uuid values.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+            SELECT encode(
+                set_bit(
+                    set_bit(
+                        overlay(
+                            uuid_send(gen_random_uuid())
+                            PLACING substring(
+                                int8send(
+                                    floor(
+                                        extract(epoch FROM clock_timestamp()) * 1000
+                                    )::bigint
+                                ) FROM 3
+                            )
+                            FROM 1 FOR 6
+                        ),
+                        52, 1
+                    ),
+                    53, 1
+                ),
+                'hex'
+            )::uuid
+        $$ LANGUAGE sql VOLATILE
+        """
+    )
+    op.alter_column('user', 'id', server_default=sa.text('uuid_generate_v7()'))
+    op.alter_column('item', 'id', server_default=sa.text('uuid_generate_v7()'))
+
+
+def downgrade():
+    op.alter_column('item', 'id', server_default=None)
+    op.alter_column('user', 'id', server_default=None)
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
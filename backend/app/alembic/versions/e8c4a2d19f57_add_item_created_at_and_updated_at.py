@@ -0,0 +1,117 @@
+"""Add item created_at and updated_at with time range indexes
+
+Revision ID: e8c4a2d19f57
+Revises: d5b2e9f07a13
+Create Date: 2026-10-17 21:14:52.306718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c4a2d19f57'
+down_revision = 'd5b2e9f07a13'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# UUIDv7 ids carry their creation time in the first 48 bits. Older v4 ids do
+# not, those rows get the time of the backfill.
+CREATED_AT_FROM_ID = """
+    CASE WHEN substr(id::text, 15, 1) = '7'
+        THEN to_timestamp(
+            ('x' || lpad(substr(replace(id::text, '-', ''), 1, 12), 16, '0'))
+                ::bit(64)::bigint / 1000.0
+        )
+        ELSE :backfilled_at
+    END
+"""
+
+
+def upgrade():
+    # Nullable columns without a default are added without rewriting the table
+    op.add_column('item', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('item', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    # Only affects rows inserted from now on
+    op.alter_column('item', 'created_at', server_default=sa.text('now()'))
+    op.alter_column('item', 'updated_at', server_default=sa.text('now()'))
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        backfilled_at = connection.execute(sa.text("SELECT now()")).scalar()
+        # Walk the primary key in batches, each committed on its own, so row
+        # locks are short lived and no batch rescans the rows already done
+        after = '00000000-0000-0000-0000-000000000000'
+        while True:
+            # The last id of the batch, None once fewer rows than a batch remain
+            last = connection.execute(
+                sa.text(
+                    "SELECT id FROM item WHERE id > :after"
+                    " ORDER BY id OFFSET :offset LIMIT 1"
+                ),
+                {"after": after, "offset": BACKFILL_BATCH_SIZE - 1},
+            ).scalar()
+            upper_bound = "" if last is None else " AND id <= :last"
+            connection.execute(
+                sa.text(
+                    f"UPDATE item SET created_at = {CREATED_AT_FROM_ID},"
+                    f" updated_at = {CREATED_AT_FROM_ID}"
+                    f" WHERE id > :after{upper_bound} AND created_at IS NULL"
+                ),
+                {"after": after, "last": last, "backfilled_at": backfilled_at},
+            )
+            if last is None:
+                break
+            after = last
+
+        # SET NOT NULL would scan the table under an exclusive lock. A validated
+        # CHECK constraint proves the same while allowing writes, and lets SET
+        # NOT NULL skip the scan.
+        for column in ('created_at', 'updated_at'):
+            constraint = f'item_{column}_not_null'
+            op.execute(
+                f"ALTER TABLE item ADD CONSTRAINT {constraint}"
+                f" CHECK ({column} IS NOT NULL) NOT VALID"
+            )
+            op.execute(f"ALTER TABLE item VALIDATE CONSTRAINT {constraint}")
+            op.alter_column('item', column, nullable=False)
+            op.drop_constraint(constraint, 'item', type_='check')
+
+        op.create_index(
+            'ix_item_owner_id_created_at',
+            'item',
+            ['owner_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_item_created_at_brin',
+            'item',
+            ['created_at'],
+            unique=False,
+            postgresql_using='brin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_item_created_at_brin',
+            table_name='item',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_item_owner_id_created_at',
+            table_name='item',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('item', 'updated_at')
+    op.drop_column('item', 'created_at')
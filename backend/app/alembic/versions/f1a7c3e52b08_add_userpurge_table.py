@@ -0,0 +1,43 @@
+"""Add userpurge table for background user purges
+
+Revision ID: f1a7c3e52b08
+Revises: e8c4a2d19f57
+Create Date: 2026-10-18 10:26:41.582913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a7c3e52b08'
+down_revision = 'e8c4a2d19f57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'userpurge',
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('deleted', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    # Only unfinished purges are looked up by the worker
+    op.create_index(
+        'ix_userpurge_updated_at_active',
+        'userpurge',
+        ['updated_at'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_userpurge_updated_at_active', table_name='userpurge')
+    op.drop_table('userpurge')
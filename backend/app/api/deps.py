@@ -1,16 +1,20 @@
-from collections.abc import Generator
+import uuid
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated, Any, TypeVar
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.db_factory import engine
+from app.core.db_factory import get_async_engine, get_engine
+from app.core.principal_cache import Principal, principal_cache
+from app.core.replica import CONSISTENCY_TOKEN_HEADER, replica_router
 from app.models import TokenPayload, User
 
 # 定义类型变量
@@ -33,10 +37,35 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 
 def get_db() -> Generator[Session, None, None]:
+    # Writes return their rows with RETURNING, so keeping loaded state after
+    # commit saves a SELECT per object the response still reads
+    with Session(get_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Session for read-only routes, served by the replica when one is configured.
+
+    A request carrying a consistency token is only routed to the replica once it
+    has replayed the caller's writes, otherwise it reads from the primary.
+    """
+    try:
+        engine = replica_router.read_engine(
+            request.headers.get(CONSISTENCY_TOKEN_HEADER)
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid consistency token")
     with Session(engine) as session:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # Objects are not expired on commit, lazy refreshes are not possible on an
+    # async session
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
 def get_supabase() -> Generator[SupabaseClient | None, None, None]:
     """Provides a Supabase client instance (if available).
 
@@ -51,30 +80,91 @@ def get_supabase() -> Generator[SupabaseClient | None, None, None]:
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 SupabaseDep = Annotated[Any | None, Depends(get_supabase)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def _get_token_subject(token: str) -> uuid.UUID:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
+        return uuid.UUID(token_data.sub)
+    except (InvalidTokenError, ValidationError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+
+
+def _get_current_user(session: Session, token: str, *, cache: bool) -> User:
+    user_id = _get_token_subject(token)
+    user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if cache:
+        principal_cache.set(Principal.from_user(user))
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
 
+def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    return _get_current_user(session, token, cache=True)
+
+
+def get_current_user_read(session: ReadSessionDep, token: TokenDep) -> User:
+    """Like ``get_current_user``, but loads the user through the read session.
+
+    The user is not cached as a principal: a lagging replica can still return
+    it as it was before a deactivation that just invalidated the cache entry.
+    """
+    return _get_current_user(session, token, cache=False)
+
+
+def get_current_principal(session: SessionDep, token: TokenDep) -> Principal:
+    """Resolve the caller without loading the full user row when possible.
+
+    Routes that only need the caller's id and permission flags should depend on
+    this instead of ``get_current_user``; a cache hit costs no database query.
+    """
+    user_id = _get_token_subject(token)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = session.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.set(principal)
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
+async def get_current_principal_async(
+    session: AsyncSessionDep, token: TokenDep
+) -> Principal:
+    """Async variant of ``get_current_principal`` for routes on ``AsyncSessionDep``."""
+    user_id = _get_token_subject(token)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await session.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.set(principal)
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+ReadCurrentUser = Annotated[User, Depends(get_current_user_read)]
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+AsyncCurrentPrincipal = Annotated[Principal, Depends(get_current_principal_async)]
 
 
 def get_current_active_superuser(current_user: CurrentUser) -> User:
@@ -0,0 +1,83 @@
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Row, Select, literal, tuple_
+from sqlmodel import col
+
+from app.api.pagination import decode_cursor, decode_time_cursor, encode_cursor
+from app.api.serialization import select_public
+from app.crud import item_time_conditions
+from app.models import Item, ItemPublic, ItemSort
+
+# The item listing statements, shared by the sync and async `read_items` routes
+# so both only differ in how they execute them.
+
+
+def _sort_key(sort: ItemSort) -> tuple[str, bool]:
+    """The column a sort orders by before the item id, and if it is descending."""
+    return sort.removeprefix("-"), sort.startswith("-")
+
+
+def _decode_sort_cursor(cursor: str, column: str) -> tuple[Any, ...]:
+    if column == "created_at":
+        return decode_time_cursor(cursor)
+    return decode_cursor(cursor, 2)
+
+
+def select_items_page(
+    *,
+    owner_id: uuid.UUID | None,
+    sort: ItemSort,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+    created_after: datetime | None,
+    created_before: datetime | None,
+) -> Select[Any]:
+    """SELECT a page of ``ItemPublic`` rows and one more to tell if a next exists.
+
+    ``owner_id`` None lists the items of every owner, for superusers. A cursor
+    seeks past the sort key it encodes, ``skip`` only applies without one.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    statement = select_public(Item, ItemPublic).where(
+        *item_time_conditions(
+            created_after=created_after, created_before=created_before
+        )
+    )
+    if owner_id is not None:
+        statement = statement.where(col(Item.owner_id) == owner_id)
+
+    column, descending = _sort_key(sort)
+    key = [col(getattr(Item, column)), col(Item.id)]
+    if cursor:
+        seek = tuple_(
+            *(literal(value) for value in _decode_sort_cursor(cursor, column))
+        )
+        statement = statement.where(
+            tuple_(*key) < seek if descending else tuple_(*key) > seek
+        )
+    else:
+        statement = statement.offset(skip)
+    statement = statement.order_by(
+        *(key_column.desc() if descending else key_column for key_column in key)
+    )
+    return statement.limit(limit + 1)
+
+
+def items_page(
+    rows: Iterable[Row[Any]], *, sort: ItemSort, limit: int
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Split the rows of ``select_items_page`` into the page and its next cursor."""
+    items = [row._asdict() for row in rows]
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        column, _ = _sort_key(sort)
+        next_cursor = encode_cursor(last[column], last["id"])
+    return items, next_cursor
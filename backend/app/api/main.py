@@ -1,9 +1,21 @@
 from fastapi import APIRouter
 
-from app.api.routes import items, login, private, users, utils
+from app.api.routes import (
+    async_items,
+    async_login,
+    items,
+    login,
+    private,
+    users,
+    utils,
+)
 from app.core.config import settings
 
 api_router = APIRouter()
+if settings.DATABASE_ASYNC:
+    # Included first so they shadow the sync routes they replace
+    api_router.include_router(async_login.router)
+    api_router.include_router(async_items.router)
 api_router.include_router(login.router)
 api_router.include_router(users.router)
 api_router.include_router(utils.router)
@@ -1,3 +1,11 @@
+from .consistency import ConsistencyTokenMiddleware
+from .metrics import MetricsMiddleware
 from .posthog import PostHogMiddleware
+from .query_stats import QueryStatsMiddleware
 
-__all__ = ["PostHogMiddleware"]
+__all__ = [
+    "ConsistencyTokenMiddleware",
+    "MetricsMiddleware",
+    "PostHogMiddleware",
+    "QueryStatsMiddleware",
+]
@@ -0,0 +1,33 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.replica import CONSISTENCY_TOKEN_HEADER, replica_router, track_writes
+
+
+class ConsistencyTokenMiddleware:
+    """Pure ASGI middleware returning the primary's WAL position after commits.
+
+    Clients send the value back in the same header so their reads are only
+    served by a replica that has caught up with their writes. The header is set
+    when the response starts, so commits made while streaming a body are not
+    covered. Only installed when a replica is configured.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_writes() as tracker:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and tracker.committed:
+                    lsn = await run_in_threadpool(replica_router.primary_lsn)
+                    MutableHeaders(scope=message)[CONSISTENCY_TOKEN_HEADER] = lsn
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
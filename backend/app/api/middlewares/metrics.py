@@ -0,0 +1,50 @@
+import time
+
+import anyio.to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    http_request_duration,
+    http_requests_in_progress,
+    threadpool_threads_busy,
+    threadpool_threads_total,
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and in-flight requests.
+
+    Threadpool use is sampled along the way. Only the status code is read from the response, so streaming bodies pass
+    through unbuffered and the time spent sending them counts towards latency.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        threadpool_threads_total.set(limiter.total_tokens)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_progress.dec()
+            threadpool_threads_busy.set(limiter.borrowed_tokens)
+            # Ids match the OpenAPI operation ids from custom_generate_unique_id
+            route_id = getattr(scope.get("route"), "unique_id", "unmatched")
+            http_request_duration.labels(
+                route=route_id, method=scope["method"], status=str(status_code)
+            ).observe(time.perf_counter() - started)
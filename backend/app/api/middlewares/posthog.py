@@ -1,43 +1,44 @@
 import time
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
-from app.utils import PostHogTracker
-
-
-class PostHogMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        start_time = time.time()
-
-        # Process the request
-        response = await call_next(request)
-
-        if settings.posthog_enabled:
-            # Get the user ID if there is authentication
-            user_id = None
-            try:
-                user = getattr(request.state, "user", None)
-                if user and hasattr(user, "id"):
-                    user_id = str(user.id)
-            except Exception:
-                pass
-
-            # Capture API events
-            path = request.url.path
-            if path.startswith(settings.API_V1_STR):
-                PostHogTracker.capture_event(
-                    event_name="api_request",
-                    user_id=user_id or "anonymous",
-                    properties={
-                        "path": path,
-                        "method": request.method,
-                        "status_code": response.status_code,
-                        "duration_ms": (time.time() - start_time) * 1000,
-                    },
-                )
-
-        return response
+from app.utils.posthog_pipeline import PostHogPipeline, posthog_pipeline
+
+
+class PostHogMiddleware:
+    """Pure ASGI middleware that samples API requests into the PostHog pipeline.
+
+    Only the status code is read from the response, the body passes through
+    untouched, so streaming responses are not buffered. Requests are keyed by
+    their route template rather than the raw path to keep groups bounded.
+    """
+
+    def __init__(self, app: ASGIApp, pipeline: PostHogPipeline = posthog_pipeline):
+        self.app = app
+        self.pipeline = pipeline
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(settings.API_V1_STR):
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.pipeline.record(
+                getattr(route, "path", "unmatched"),
+                scope["method"],
+                status_code,
+                time.perf_counter() - start_time,
+            )
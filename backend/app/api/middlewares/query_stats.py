@@ -0,0 +1,54 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db_instrumentation import (
+    report_repeated_statements,
+    route_query_stats,
+    track_queries,
+)
+from app.core.metrics import http_request_db_duration, http_request_db_queries
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware reporting each request's database activity.
+
+    Adds a ``Server-Timing`` header, adds the request to the per-route totals and
+    metrics and logs likely N+1 query patterns. The header goes out with the response start
+    and covers the queries issued until then; the totals and the N+1 check wait
+    for the whole body, so they include queries made by streaming responses.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if (
+                    message["type"] == "http.response.start"
+                    and settings.SERVER_TIMING_ENABLED
+                ):
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                route_name = f"{scope['method']} {getattr(route, 'path', 'unmatched')}"
+                route_query_stats.add(route_name, stats)
+                route_id = getattr(route, "unique_id", "unmatched")
+                http_request_db_queries.labels(
+                    route=route_id, method=scope["method"]
+                ).observe(stats.queries)
+                http_request_db_duration.labels(
+                    route=route_id, method=scope["method"]
+                ).observe(stats.db_time)
+                report_repeated_statements(route_name, stats)
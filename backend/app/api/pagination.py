@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+def clamp_limit(limit: int) -> int:
+    """Bound a requested page size to ``[1, PAGINATION_MAX_LIMIT]``."""
+    return max(1, min(limit, settings.PAGINATION_MAX_LIMIT))
+
+
+def encode_cursor(*keys: uuid.UUID | datetime) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    raw = json.dumps(
+        [key.isoformat() if isinstance(key, datetime) else str(key) for key in keys],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_keys(cursor: str, size: int) -> list[str]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    keys: Any = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(keys, list) or len(keys) != size:
+        raise ValueError(cursor)
+    return keys
+
+
+def decode_cursor(cursor: str, size: int) -> tuple[uuid.UUID, ...]:
+    """Decode a cursor produced by ``encode_cursor`` with ``size`` keys.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        return tuple(uuid.UUID(key) for key in _decode_keys(cursor, size))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_time_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Decode a cursor whose sort key is a timestamp followed by an id.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        timestamp, key = _decode_keys(cursor, 2)
+        return datetime.fromisoformat(timestamp), uuid.UUID(key)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
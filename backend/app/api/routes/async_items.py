@@ -0,0 +1,144 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud_async
+from app.api.deps import AsyncCurrentPrincipal, AsyncSessionDep
+from app.api.item_listing import items_page, select_items_page
+from app.api.pagination import clamp_limit
+from app.api.serialization import page_response
+from app.core.config import settings
+from app.models import (
+    CountStrategy,
+    Item,
+    ItemCreate,
+    ItemPublic,
+    ItemSort,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
+
+# Async versions of the item CRUD routes in `items`, used when DATABASE_ASYNC is
+# set. Item ids use the uuid path convertor so `/items/export` and friends still
+# fall through to the sync router.
+router = APIRouter(prefix="/items", tags=["items"])
+
+
+@router.get("/", response_model=ItemsPublic)
+async def read_items(
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count: CountStrategy | None = None,
+    sort: ItemSort = "owner_id",
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+) -> Any:
+    """
+    Retrieve items.
+
+    Items are ordered by (owner_id, id), or newest first with
+    `sort=-created_at`. Pass the `next_cursor` of a page as `cursor` to fetch
+    the next one without scanning past skipped rows; it is only valid with the
+    same `sort`. `created_after` and `created_before` keep the items created in
+    that range, both ends exclusive.
+    `count` selects how the total is computed; `none` skips it.
+    """
+    limit = clamp_limit(limit)
+    owner_id = None if current_user.is_superuser else current_user.id
+    total = await crud_async.count_items(
+        session=session,
+        owner_id=owner_id,
+        strategy=count or settings.LIST_COUNT_STRATEGY,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    statement = select_items_page(
+        owner_id=owner_id,
+        sort=sort,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    items, next_cursor = items_page(
+        await session.execute(statement), sort=sort, limit=limit
+    )
+    return page_response(items, count=total, next_cursor=next_cursor)
+
+
+@router.get("/{id:uuid}", response_model=ItemPublic)
+async def read_item(
+    session: AsyncSessionDep, current_user: AsyncCurrentPrincipal, id: uuid.UUID
+) -> Any:
+    """
+    Get item by ID.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return item
+
+
+@router.post("/", response_model=ItemPublic)
+async def create_item(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    item_in: ItemCreate,
+) -> Any:
+    """
+    Create new item.
+    """
+    return await crud_async.create_item(
+        session=session, item_in=item_in, owner_id=current_user.id
+    )
+
+
+async def _item_write_miss(session: AsyncSession, item_id: uuid.UUID) -> HTTPException:
+    """The error for a conditional write that matched no row."""
+    if await crud_async.item_exists(session=session, item_id=item_id):
+        return HTTPException(status_code=400, detail="Not enough permissions")
+    return HTTPException(status_code=404, detail="Item not found")
+
+
+@router.put("/{id:uuid}", response_model=ItemPublic)
+async def update_item(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    id: uuid.UUID,
+    item_in: ItemUpdate,
+) -> Any:
+    """
+    Update an item.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    item = await crud_async.update_item(
+        session=session, item_id=id, owner_id=owner_id, item_in=item_in
+    )
+    if item is None:
+        raise await _item_write_miss(session, id)
+    return item
+
+
+@router.delete("/{id:uuid}")
+async def delete_item(
+    session: AsyncSessionDep, current_user: AsyncCurrentPrincipal, id: uuid.UUID
+) -> Message:
+    """
+    Delete an item.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    if not await crud_async.delete_item(session=session, item_id=id, owner_id=owner_id):
+        raise await _item_write_miss(session, id)
+    return Message(message="Item deleted successfully")
@@ -1,48 +1,429 @@
+import csv
+import io
+import json
+import time
 import uuid
-from typing import Any
+import zlib
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Literal, TextIO
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlmodel import Session, col, select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app import crud
+from app.api.deps import CurrentPrincipal, ReadSessionDep, SessionDep
+from app.api.item_listing import items_page, select_items_page
+from app.api.pagination import clamp_limit
+from app.api.serialization import page_response
+from app.core.config import settings
+from app.core.db_factory import get_engine
+from app.models import (
+    CountStrategy,
+    Item,
+    ItemBulkResult,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkCreate,
+    ItemsBulkDelete,
+    ItemsBulkResult,
+    ItemsBulkUpdate,
+    ItemsImportResult,
+    ItemSort,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = ("id", "owner_id", "title", "description")
+
 
 @router.get("/", response_model=ItemsPublic)
 def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: ReadSessionDep,
+    current_user: CurrentPrincipal,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count: CountStrategy | None = None,
+    sort: ItemSort = "owner_id",
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
 ) -> Any:
     """
     Retrieve items.
+
+    Items are ordered by (owner_id, id), or newest first with
+    `sort=-created_at`. Pass the `next_cursor` of a page as `cursor` to fetch
+    the next one without scanning past skipped rows; it is only valid with the
+    same `sort`. `created_after` and `created_before` keep the items created in
+    that range, both ends exclusive.
+    `count` selects how the total is computed; `none` skips it.
+    """
+    limit = clamp_limit(limit)
+    owner_id = None if current_user.is_superuser else current_user.id
+    total = crud.count_items(
+        session=session,
+        owner_id=owner_id,
+        strategy=count or settings.LIST_COUNT_STRATEGY,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    statement = select_items_page(
+        owner_id=owner_id,
+        sort=sort,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    items, next_cursor = items_page(session.execute(statement), sort=sort, limit=limit)
+    return page_response(items, count=total, next_cursor=next_cursor)
+
+
+def _iter_item_export(
+    *,
+    owner_id: uuid.UUID | None,
+    after: uuid.UUID | None,
+    export_format: Literal["ndjson", "csv"],
+    compress: bool,
+) -> Iterator[bytes]:
+    """Stream items in id order from a server-side cursor.
+
+    The generator runs after the route has returned and its request session has
+    been closed, so it opens its own session. Rows are fetched and encoded one
+    partition at a time and are never loaded as ORM objects, so memory use does
+    not depend on how many items are exported.
+    """
+    statement = select(Item.id, Item.owner_id, Item.title, Item.description)
+    if owner_id is not None:
+        statement = statement.where(Item.owner_id == owner_id)
+    if after is not None:
+        statement = statement.where(col(Item.id) > after)
+    statement = statement.order_by(col(Item.id)).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+    def encode(chunk: str) -> bytes:
+        data = chunk.encode()
+        return compressor.compress(data) if compressor else data
+
+    with Session(get_engine()) as session:
+        if export_format == "csv":
+            yield encode(",".join(EXPORT_FIELDS) + "\r\n")
+        for partition in session.exec(statement).partitions():
+            buffer = io.StringIO()
+            if export_format == "csv":
+                csv.writer(buffer).writerows(
+                    (str(id), str(item_owner_id), title, description or "")
+                    for id, item_owner_id, title, description in partition
+                )
+            else:
+                for id, item_owner_id, title, description in partition:
+                    buffer.write(
+                        json.dumps(
+                            {
+                                "id": str(id),
+                                "owner_id": str(item_owner_id),
+                                "title": title,
+                                "description": description,
+                            }
+                        )
+                    )
+                    buffer.write("\n")
+            yield encode(buffer.getvalue())
+    if compressor:
+        yield compressor.flush()
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_items(
+    request: Request,
+    current_user: CurrentPrincipal,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    after: uuid.UUID | None = None,
+) -> Any:
+    """
+    Export items as NDJSON or CSV.
+
+    Items are streamed in id order. To resume an interrupted export, pass the id
+    of the last item received as `after`. The body is gzip-compressed when the
+    client accepts it.
     """
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {
+        "Content-Disposition": f'attachment; filename="items.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        _iter_item_export(
+            owner_id=None if current_user.is_superuser else current_user.id,
+            after=after,
+            export_format=format,
+            compress=compress,
+        ),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers=headers,
+    )
+
+
+class _ImportErrorLog:
+    """Append-only NDJSON log of rows rejected by an import, created on first use."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.count = 0
+        self._file: TextIO | None = None
+
+    def write(self, line: int, errors: list[Any]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("w", encoding="utf-8")
+        self._file.write(json.dumps({"line": line, "errors": errors}, default=str))
+        self._file.write("\n")
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = select(Item).offset(skip).limit(limit)
-        items = session.exec(statement).all()
+
+def _import_errors_path(owner_id: uuid.UUID, import_id: uuid.UUID) -> Path:
+    return Path(settings.ITEMS_IMPORT_ERRORS_DIR) / f"{owner_id}-{import_id}.ndjson"
+
+
+def _import_errors_expired(path: Path) -> bool:
+    age = time.time() - path.stat().st_mtime
+    return age > settings.ITEMS_IMPORT_ERRORS_RETENTION_SECONDS
+
+
+def _delete_expired_import_errors() -> None:
+    """Delete the error files of every owner that are past their retention."""
+    for path in Path(settings.ITEMS_IMPORT_ERRORS_DIR).glob("*.ndjson"):
+        try:
+            if _import_errors_expired(path):
+                path.unlink()
+        except FileNotFoundError:
+            # Deleted by a concurrent import
+            continue
+
+
+def _iter_csv_rows(
+    text: TextIO, error_log: _ImportErrorLog
+) -> Iterator[tuple[int, dict[Any, Any]]]:
+    """Read CSV rows, logging the ones the csv module cannot parse."""
+    reader = csv.DictReader(text)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # DictReader only copies line_num from its reader on success
+            line_number = reader.reader.line_num
+            error_log.write(line_number, [{"type": "csv_invalid", "msg": str(e)}])
+            continue
+        yield reader.line_num, {key: value or None for key, value in row.items()}
+
+
+def _check_utf8(row: str | dict[Any, Any]) -> None:
+    """Raise UnicodeEncodeError if the row holds bytes that were not UTF-8."""
+    for value in [row] if isinstance(row, str) else [*row, *row.values()]:
+        if isinstance(value, str):
+            value.encode("utf-8")
+
+
+def _iter_import_rows(
+    upload: BinaryIO,
+    import_format: Literal["ndjson", "csv"],
+    error_log: _ImportErrorLog,
+) -> Iterator[ItemCreate]:
+    """Parse and validate an upload one row at a time, logging rejected rows."""
+    # Invalid UTF-8 is decoded to lone surrogates and rejected per row, so it
+    # does not abort the rest of the upload
+    text = io.TextIOWrapper(
+        upload, encoding="utf-8", errors="surrogateescape", newline=""
+    )
+    rows: Iterator[tuple[int, Any]]
+    if import_format == "csv":
+        rows = _iter_csv_rows(text, error_log)
     else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
+        rows = (
+            (line_number, line)
+            for line_number, line in enumerate(text, start=1)
+            if line.strip()
         )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
+    for line_number, row in rows:
+        try:
+            _check_utf8(row)
+            data = json.loads(row) if isinstance(row, str) else row
+            item_in = ItemCreate.model_validate(data)
+        except UnicodeEncodeError:
+            error_log.write(
+                line_number,
+                [{"type": "unicode_invalid", "msg": "Row is not valid UTF-8"}],
+            )
+            continue
+        except ValidationError as e:
+            error_log.write(line_number, e.errors(include_url=False))
+            continue
+        except ValueError as e:
+            error_log.write(line_number, [{"type": "json_invalid", "msg": str(e)}])
+            continue
+        yield item_in
+
+
+@router.post("/import", response_model=ItemsImportResult)
+def import_items(
+    session: SessionDep,
+    current_user: CurrentPrincipal,
+    file: UploadFile,
+    format: Literal["ndjson", "csv"] = "ndjson",
+) -> Any:
+    """
+    Import items from an NDJSON or CSV upload.
+
+    Rows are validated one at a time and loaded with COPY in a single
+    transaction. Invalid rows do not abort the import; they are written to an
+    errors file served by `/items/import/{import_id}/errors` until it expires.
+    """
+    _delete_expired_import_errors()
+    import_id = uuid.uuid4()
+    error_log = _ImportErrorLog(_import_errors_path(current_user.id, import_id))
+    try:
+        imported = crud.copy_items(
+            session=session,
+            items_in=_iter_import_rows(file.file, format, error_log),
+            owner_id=current_user.id,
         )
-        items = session.exec(statement).all()
+    finally:
+        error_log.close()
+    return ItemsImportResult(
+        import_id=import_id, imported=imported, failed=error_log.count
+    )
 
-    return ItemsPublic(data=items, count=count)
+
+@router.get("/import/{import_id}/errors", response_class=FileResponse)
+def read_import_errors(current_user: CurrentPrincipal, import_id: uuid.UUID) -> Any:
+    """
+    Download the rows rejected by an import as NDJSON.
+    """
+    path = _import_errors_path(current_user.id, import_id)
+    if not path.is_file() or _import_errors_expired(path):
+        raise HTTPException(status_code=404, detail="Import errors not found")
+    return FileResponse(path, media_type="application/x-ndjson")
+
+
+def _existing_item_ids(session: Session, item_ids: set[uuid.UUID]) -> set[uuid.UUID]:
+    """The ids a bulk write skipped that exist, to tell 404 from 400."""
+    if not item_ids:
+        return set()
+    statement = select(Item.id).where(col(Item.id).in_(item_ids))
+    return set(session.exec(statement).all())
+
+
+def _bulk_miss(
+    index: int, item_id: uuid.UUID, existing: set[uuid.UUID]
+) -> ItemBulkResult:
+    """The result of a bulk row whose write matched no row."""
+    if item_id in existing:
+        return ItemBulkResult(
+            index=index, id=item_id, status_code=400, detail="Not enough permissions"
+        )
+    return ItemBulkResult(
+        index=index, id=item_id, status_code=404, detail="Item not found"
+    )
+
+
+@router.post("/bulk", response_model=ItemsBulkResult)
+def create_items_bulk(
+    *, session: SessionDep, current_user: CurrentPrincipal, items_in: ItemsBulkCreate
+) -> Any:
+    """
+    Create many items in one transaction.
+    """
+    items = crud.create_items(
+        session=session, items_in=items_in.data, owner_id=current_user.id
+    )
+    return ItemsBulkResult(
+        data=[
+            ItemBulkResult(index=index, id=item.id, status_code=200, item=item)
+            for index, item in enumerate(items)
+        ]
+    )
+
+
+@router.patch("/bulk", response_model=ItemsBulkResult)
+def update_items_bulk(
+    *, session: SessionDep, current_user: CurrentPrincipal, items_in: ItemsBulkUpdate
+) -> Any:
+    """
+    Update many items in one transaction.
+
+    Rows that do not exist or that the caller may not change are reported in
+    the result and skipped; the other rows are still updated.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    items = crud.update_items(
+        session=session, items_in=items_in.data, owner_id=owner_id
+    )
+    # Only the ids the UPDATE skipped need a lookup
+    existing = _existing_item_ids(
+        session, {item_in.id for item_in in items_in.data} - items.keys()
+    )
+
+    results: list[ItemBulkResult] = []
+    for index, item_in in enumerate(items_in.data):
+        item = items.get(item_in.id)
+        if item is not None:
+            results.append(
+                ItemBulkResult(index=index, id=item.id, status_code=200, item=item)
+            )
+        else:
+            results.append(_bulk_miss(index, item_in.id, existing))
+    return ItemsBulkResult(data=results)
+
+
+@router.delete("/bulk", response_model=ItemsBulkResult)
+def delete_items_bulk(
+    *, session: SessionDep, current_user: CurrentPrincipal, items_in: ItemsBulkDelete
+) -> Any:
+    """
+    Delete many items in one transaction.
+
+    Rows that do not exist or that the caller may not delete are reported in
+    the result and skipped; the other rows are still deleted.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    deleted = crud.delete_items(
+        session=session, item_ids=items_in.ids, owner_id=owner_id
+    )
+    # Only the ids the DELETE skipped need a lookup
+    existing = _existing_item_ids(session, set(items_in.ids) - deleted)
+
+    results: list[ItemBulkResult] = []
+    for index, item_id in enumerate(items_in.ids):
+        if item_id in deleted:
+            results.append(ItemBulkResult(index=index, id=item_id, status_code=200))
+        else:
+            results.append(_bulk_miss(index, item_id, existing))
+    return ItemsBulkResult(data=results)
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_item(
+    session: ReadSessionDep, current_user: CurrentPrincipal, id: uuid.UUID
+) -> Any:
     """
     Get item by ID.
     """
@@ -56,54 +437,49 @@ def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) ->
 
 @router.post("/", response_model=ItemPublic)
 def create_item(
-    *, session: SessionDep, current_user: CurrentUser, item_in: ItemCreate
+    *, session: SessionDep, current_user: CurrentPrincipal, item_in: ItemCreate
 ) -> Any:
     """
     Create new item.
     """
-    item = Item.model_validate(item_in, update={"owner_id": current_user.id})
-    session.add(item)
-    session.commit()
-    session.refresh(item)
-    return item
+    return crud.create_item(session=session, item_in=item_in, owner_id=current_user.id)
+
+
+def _item_write_miss(session: Session, item_id: uuid.UUID) -> HTTPException:
+    """The error for a conditional write that matched no row."""
+    if crud.item_exists(session=session, item_id=item_id):
+        return HTTPException(status_code=400, detail="Not enough permissions")
+    return HTTPException(status_code=404, detail="Item not found")
 
 
 @router.put("/{id}", response_model=ItemPublic)
 def update_item(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     item_in: ItemUpdate,
 ) -> Any:
     """
     Update an item.
     """
-    item = session.get(Item, id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    update_dict = item_in.model_dump(exclude_unset=True)
-    item.sqlmodel_update(update_dict)
-    session.add(item)
-    session.commit()
-    session.refresh(item)
+    owner_id = None if current_user.is_superuser else current_user.id
+    item = crud.update_item(
+        session=session, item_id=id, owner_id=owner_id, item_in=item_in
+    )
+    if item is None:
+        raise _item_write_miss(session, id)
     return item
 
 
 @router.delete("/{id}")
 def delete_item(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+    session: SessionDep, current_user: CurrentPrincipal, id: uuid.UUID
 ) -> Message:
     """
     Delete an item.
     """
-    item = session.get(Item, id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    session.delete(item)
-    session.commit()
+    owner_id = None if current_user.is_superuser else current_user.id
+    if not crud.delete_item(session=session, item_id=id, owner_id=owner_id):
+        raise _item_write_miss(session, id)
     return Message(message="Item deleted successfully")
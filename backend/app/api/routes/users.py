@@ -1,51 +1,105 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
+from sqlmodel import col
 
 from app import crud
 from app.api.deps import (
     CurrentUser,
+    ReadCurrentUser,
+    ReadSessionDep,
     SessionDep,
     get_current_active_superuser,
 )
+from app.api.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.api.serialization import page_response, select_public
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.password_hasher import password_hasher
+from app.core.principal_cache import principal_cache
+from app.core.user_purge import user_purger
 from app.models import (
-    Item,
+    CountStrategy,
     Message,
     UpdatePassword,
     User,
     UserCreate,
     UserPublic,
+    UserPurge,
+    UserPurgePublic,
     UserRegister,
     UsersPublic,
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import generate_new_account_email, generate_password_reset_token
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+def _delete_user(
+    session: SessionDep,
+    user: User,
+    background_tasks: BackgroundTasks,
+    response: Response,
+) -> Message:
+    """Delete a user now, or hand users with many items to the purger.
+
+    The item count comes from the per-owner counter, so deciding is cheap. A
+    user being purged is deactivated first so they cannot keep writing items.
+    """
+    total = crud.count_items(session=session, owner_id=user.id, strategy="estimated")
+    if not total or total <= settings.USER_PURGE_SYNC_THRESHOLD:
+        crud.delete_user(session=session, user_id=user.id)
+        return Message(message="User deleted successfully")
+    if crud.schedule_user_purge(session=session, user_id=user.id, total=total):
+        user.is_active = False
+        session.add(user)
+        session.commit()
+        principal_cache.invalidate(user.id)
+        background_tasks.add_task(user_purger.run, user.id)
+    response.status_code = 202
+    return Message(message="User deletion scheduled")
+
+
 @router.get(
     "/",
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: ReadSessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count: CountStrategy | None = None,
+) -> Any:
     """
     Retrieve users.
-    """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+    Users are ordered by id. Pass the `next_cursor` of a page as `cursor` to
+    fetch the next one without scanning past skipped rows.
+    `count` selects how the total is computed; `none` skips it.
+    """
+    limit = clamp_limit(limit)
+    total = crud.count_users(
+        session=session, strategy=count or settings.LIST_COUNT_STRATEGY
+    )
 
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
+    statement = select_public(User, UserPublic)
+    if cursor:
+        (user_id,) = decode_cursor(cursor, 1)
+        statement = statement.where(col(User.id) > user_id)
+    else:
+        statement = statement.offset(skip)
+    statement = statement.order_by(col(User.id)).limit(limit + 1)
+    users = [row._asdict() for row in session.execute(statement)]
 
-    return UsersPublic(data=users, count=count)
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1]["id"])
+    return page_response(users, count=total, next_cursor=next_cursor)
 
 
 @router.post(
@@ -55,23 +109,25 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
     """
     Create new user.
     """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
-    if user:
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this email already exists in the system.",
-        )
-
-    user = crud.create_user(session=session, user_create=user_in)
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
-            email_to=user_in.email, username=user_in.email, password=user_in.password
+            email_to=user_in.email,
+            username=user_in.email,
+            token=generate_password_reset_token(email=user_in.email),
         )
-        send_email(
+        # Committed together with the new user, rolled back with it on conflict
+        crud.add_outbox_email(
+            session=session,
             email_to=user_in.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
         )
+    user = crud.create_user_if_absent(session=session, user_create=user_in)
+    if user is None:
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system.",
+        )
     return user
 
 
@@ -82,19 +138,12 @@ def update_user_me(
     """
     Update own user.
     """
-
-    if user_in.email:
-        existing_user = crud.get_user_by_email(session=session, email=user_in.email)
-        if existing_user and existing_user.id != current_user.id:
-            raise HTTPException(
-                status_code=409, detail="User with this email already exists"
-            )
-    user_data = user_in.model_dump(exclude_unset=True)
-    current_user.sqlmodel_update(user_data)
-    session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
-    return current_user
+    user = crud.update_user(session=session, db_user=current_user, user_in=user_in)
+    if user is None:
+        raise HTTPException(
+            status_code=409, detail="User with this email already exists"
+        )
+    return user
 
 
 @router.patch("/me/password", response_model=Message)
@@ -104,13 +153,13 @@ def update_password_me(
     """
     Update own password.
     """
-    if not verify_password(body.current_password, current_user.hashed_password):
+    if not password_hasher.verify(body.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
-    hashed_password = get_password_hash(body.new_password)
+    hashed_password = password_hasher.hash(body.new_password)
     current_user.hashed_password = hashed_password
     session.add(current_user)
     session.commit()
@@ -118,7 +167,7 @@ def update_password_me(
 
 
 @router.get("/me", response_model=UserPublic)
-def read_user_me(current_user: CurrentUser) -> Any:
+def read_user_me(current_user: ReadCurrentUser) -> Any:
     """
     Get current user.
     """
@@ -126,17 +175,22 @@ def read_user_me(current_user: CurrentUser) -> Any:
 
 
 @router.delete("/me", response_model=Message)
-def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
+def delete_user_me(
+    session: SessionDep,
+    current_user: CurrentUser,
+    background_tasks: BackgroundTasks,
+    response: Response,
+) -> Any:
     """
     Delete own user.
+
+    Users with many items are purged in the background and get a 202.
     """
     if current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    session.delete(current_user)
-    session.commit()
-    return Message(message="User deleted successfully")
+    return _delete_user(session, current_user, background_tasks, response)
 
 
 @router.post("/signup", response_model=UserPublic)
@@ -144,20 +198,19 @@ def register_user(session: SessionDep, user_in: UserRegister) -> Any:
     """
     Create new user without the need to be logged in.
     """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
-    if user:
+    user_create = UserCreate.model_validate(user_in)
+    user = crud.create_user_if_absent(session=session, user_create=user_create)
+    if user is None:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system",
         )
-    user_create = UserCreate.model_validate(user_in)
-    user = crud.create_user(session=session, user_create=user_create)
     return user
 
 
 @router.get("/{user_id}", response_model=UserPublic)
 def read_user_by_id(
-    user_id: uuid.UUID, session: SessionDep, current_user: CurrentUser
+    user_id: uuid.UUID, session: ReadSessionDep, current_user: ReadCurrentUser
 ) -> Any:
     """
     Get a specific user by id.
@@ -194,23 +247,27 @@ def update_user(
             status_code=404,
             detail="The user with this id does not exist in the system",
         )
-    if user_in.email:
-        existing_user = crud.get_user_by_email(session=session, email=user_in.email)
-        if existing_user and existing_user.id != user_id:
-            raise HTTPException(
-                status_code=409, detail="User with this email already exists"
-            )
-
-    db_user = crud.update_user(session=session, db_user=db_user, user_in=user_in)
-    return db_user
+    updated_user = crud.update_user(session=session, db_user=db_user, user_in=user_in)
+    if updated_user is None:
+        raise HTTPException(
+            status_code=409, detail="User with this email already exists"
+        )
+    return updated_user
 
 
 @router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
 def delete_user(
-    session: SessionDep, current_user: CurrentUser, user_id: uuid.UUID
+    session: SessionDep,
+    current_user: CurrentUser,
+    user_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    response: Response,
 ) -> Message:
     """
     Delete a user.
+
+    Users with many items are purged in the background and get a 202, follow
+    the purge with `GET /users/{user_id}/purge`.
     """
     user = session.get(User, user_id)
     if not user:
@@ -219,8 +276,19 @@ def delete_user(
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    statement = delete(Item).where(col(Item.owner_id) == user_id)
-    session.exec(statement)  # type: ignore
-    session.delete(user)
-    session.commit()
-    return Message(message="User deleted successfully")
+    return _delete_user(session, user, background_tasks, response)
+
+
+@router.get(
+    "/{user_id}/purge",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=UserPurgePublic,
+)
+def read_user_purge(session: ReadSessionDep, user_id: uuid.UUID) -> Any:
+    """
+    Get the progress of a background user purge.
+    """
+    job = session.get(UserPurge, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Purge not found")
+    return job
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends
+import secrets
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from pydantic.networks import EmailStr
 
-from app.api.deps import get_current_active_superuser
+from app import crud
+from app.api.deps import SessionDep, get_current_active_superuser
+from app.core.config import settings
+from app.core.metrics import render_metrics
 from app.models import Message
-from app.utils import generate_test_email, send_email
+from app.utils import generate_test_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -13,19 +19,35 @@ router = APIRouter(prefix="/utils", tags=["utils"])
     dependencies=[Depends(get_current_active_superuser)],
     status_code=201,
 )
-def test_email(email_to: EmailStr) -> Message:
+def test_email(session: SessionDep, email_to: EmailStr) -> Message:
     """
     Test emails.
     """
     email_data = generate_test_email(email_to=email_to)
-    send_email(
+    crud.add_outbox_email(
+        session=session,
         email_to=email_to,
         subject=email_data.subject,
         html_content=email_data.html_content,
     )
+    session.commit()
     return Message(message="Test email sent")
 
 
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get("/metrics/", include_in_schema=False)
+def metrics(authorization: Annotated[str | None, Header()] = None) -> Response:
+    """
+    Prometheus metrics, aggregated over all worker processes.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not secrets.compare_digest(authorization or "", expected):
+        raise HTTPException(status_code=403, detail="Could not validate credentials")
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
@@ -0,0 +1,27 @@
+from collections.abc import Sequence
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import Response
+from sqlalchemy import Select, select
+from sqlmodel import SQLModel
+
+
+def select_public(table: type[SQLModel], public: type[SQLModel]) -> Select[Any]:
+    """Select the columns of ``table`` that make up ``public``, in field order."""
+    return select(*(getattr(table, name) for name in public.model_fields))
+
+
+def page_response(
+    rows: Sequence[dict[str, Any]], *, count: int | None, next_cursor: str | None
+) -> Response:
+    """Encode a list page straight to JSON bytes.
+
+    The rows come from ``select_public``, so they already have the shape of the
+    public model and are neither built into models nor validated again; the
+    route's ``response_model`` only documents the response.
+    """
+    content = pydantic_core.to_json(
+        {"data": rows, "count": count, "next_cursor": next_cursor}
+    )
+    return Response(content=content, media_type="application/json")
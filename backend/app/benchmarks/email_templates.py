@@ -0,0 +1,69 @@
+"""Measure the per-render cost of the email generators.
+
+    python -m app.benchmarks.email_templates --iterations 2000
+
+``uncached`` re-reads the template file and builds a new ``jinja2.Template`` for
+every email, as rendering did before the registry; ``registry`` renders the
+compiled template held by ``email_templates``.
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import patch
+
+from jinja2 import Template
+
+from app.utils import generate_new_account_email, generate_reset_password_email
+from app.utils.email_templates import TEMPLATES_DIR, email_templates
+
+
+def render_uncached(*, template_name: str, context: dict[str, Any]) -> str:
+    template_str = (TEMPLATES_DIR / template_name).read_text()
+    return Template(template_str).render(context)
+
+
+GENERATORS: dict[str, Callable[[], Any]] = {
+    "new_account": lambda: generate_new_account_email(
+        email_to="user@example.com", username="user@example.com", token="token"
+    ),
+    "reset_password": lambda: generate_reset_password_email(
+        email_to="user@example.com", email="user@example.com", token="token"
+    ),
+}
+
+
+def measure(generate: Callable[[], Any], iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        generate()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    email_templates.precompile()
+    print(f"{'email':<15} {'renderer':<9} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8}")
+    for name, generate in GENERATORS.items():
+        for renderer in ("uncached", "registry"):
+            if renderer == "uncached":
+                with patch("app.utils.email.render_email_template", render_uncached):
+                    samples = measure(generate, args.iterations)
+            else:
+                samples = measure(generate, args.iterations)
+            quantiles = statistics.quantiles(samples, n=100)
+            print(
+                f"{name:<15} {renderer:<9} {quantiles[49] * 1e6:>8.1f}"
+                f" {quantiles[94] * 1e6:>8.1f} {quantiles[98] * 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
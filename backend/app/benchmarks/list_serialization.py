@@ -0,0 +1,78 @@
+"""Compare list endpoint serialization with and without response model validation.
+
+    python -m app.benchmarks.list_serialization --sizes 100 1000 10000
+
+``model`` returns ORM objects through ``response_model=ItemsPublic``, so FastAPI
+validates every row into ``ItemPublic`` and encodes the result with the stdlib
+json encoder. ``projected`` returns the selected columns as dicts through
+``page_response``. Rows are built in memory, so only serialization is measured.
+"""
+
+import argparse
+import time
+import uuid
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.serialization import page_response
+from app.models import Item, ItemPublic, ItemsPublic
+
+
+def build_app(rows: int) -> FastAPI:
+    owner_id = uuid.uuid4()
+    items = [
+        Item(
+            id=uuid.uuid4(),
+            owner_id=owner_id,
+            title=f"Item {n}",
+            description="An item used to benchmark list serialization",
+        )
+        for n in range(rows)
+    ]
+    projected = [
+        {name: getattr(item, name) for name in ItemPublic.model_fields}
+        for item in items
+    ]
+    app = FastAPI()
+
+    @app.get("/model", response_model=ItemsPublic)
+    def model() -> Any:
+        return ItemsPublic(data=items, count=rows, next_cursor=None)
+
+    @app.get("/projected", response_model=ItemsPublic)
+    def projected_rows() -> Any:
+        return page_response(projected, count=rows, next_cursor=None)
+
+    return app
+
+
+def measure(client: TestClient, path: str, seconds: float) -> float:
+    """Return the requests per second served within ``seconds``."""
+    client.get(path)
+    requests = 0
+    started = time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < seconds:
+        response = client.get(path)
+        assert response.status_code == 200
+        requests += 1
+    return requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'model req/s':>12} {'projected req/s':>16} {'speedup':>8}")
+    for rows in args.sizes:
+        client = TestClient(build_app(rows))
+        model = measure(client, "/model", args.seconds)
+        projected = measure(client, "/projected", args.seconds)
+        print(f"{rows:>6} {model:>12.1f} {projected:>16.1f} {projected / model:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
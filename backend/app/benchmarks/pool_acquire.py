@@ -0,0 +1,70 @@
+"""Measure connection-acquire latency for each pool strategy.
+
+Run against the configured database with:
+
+    python -m app.benchmarks.pool_acquire --iterations 2000 --threads 4
+
+Each thread repeatedly checks a connection out, runs ``SELECT 1`` and checks it
+back in. The reported latency covers the checkout only.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import typing
+
+from sqlalchemy import text
+
+from app.core.db_factory import PoolStrategy, create_db_engine
+
+
+def measure(strategy: PoolStrategy, iterations: int, threads: int) -> list[float]:
+    engine = create_db_engine(strategy=strategy)
+    # Warm the pool up so pooled strategies are measured at steady state
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    samples: list[float] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        local: list[float] = []
+        for _ in range(iterations // threads):
+            started = time.perf_counter()
+            with engine.connect() as connection:
+                local.append(time.perf_counter() - started)
+                connection.execute(text("SELECT 1"))
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    engine.dispose()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument(
+        "--strategy", choices=typing.get_args(PoolStrategy), action="append"
+    )
+    args = parser.parse_args()
+
+    print(f"{'strategy':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for strategy in args.strategy or typing.get_args(PoolStrategy):
+        samples = sorted(measure(strategy, args.iterations, args.threads))
+        quantiles = statistics.quantiles(samples, n=100)
+        print(
+            f"{strategy:<8} {quantiles[49] * 1000:>8.3f} {quantiles[94] * 1000:>8.3f}"
+            f" {quantiles[98] * 1000:>8.3f} {samples[-1] * 1000:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
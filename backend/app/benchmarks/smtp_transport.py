@@ -0,0 +1,79 @@
+"""Compare one SMTP session per message with pooled sessions.
+
+Runs against a local SMTP sink, so no mail leaves the machine:
+
+    python -m app.benchmarks.smtp_transport --messages 200 --handshake-ms 20
+
+``--handshake-ms`` delays the server greeting to stand in for the TCP, TLS and
+AUTH round trips of a real server, which the pool pays once per session.
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from collections.abc import Callable
+from unittest.mock import patch
+
+import emails
+
+from app.core.config import settings
+from app.tests.utils.smtp_sink import SMTPSink
+from app.utils import send_email
+from app.utils.smtp_transport import get_smtp_options, smtp_transport
+
+
+def send_unpooled(email_to: str) -> None:
+    # What send_email did before sessions were pooled
+    message = emails.Message(
+        subject="Benchmark",
+        html="<p>Benchmark</p>",
+        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+    )
+    response = message.send(to=email_to, smtp=get_smtp_options())
+    assert response.success
+
+
+def send_pooled(email_to: str) -> None:
+    send_email(email_to=email_to, subject="Benchmark", html_content="<p>Benchmark</p>")
+
+
+def measure(send: Callable[[str], None], messages: int) -> list[float]:
+    samples = []
+    for n in range(messages):
+        started = time.perf_counter()
+        send(f"user{n}@example.com")
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=20)
+    args = parser.parse_args()
+    # send_email logs every response
+    logging.getLogger("app.utils.email").setLevel(logging.WARNING)
+
+    print(
+        f"{'transport':<10} {'p50 ms':>8} {'p95 ms':>8} {'total s':>8} {'sessions':>8}"
+    )
+    for name, send in (("unpooled", send_unpooled), ("pooled", send_pooled)):
+        with (
+            SMTPSink(greeting_delay=args.handshake_ms / 1000) as sink,
+            patch.object(settings, "SMTP_HOST", sink.host),
+            patch.object(settings, "SMTP_PORT", sink.port),
+            patch.object(settings, "SMTP_TLS", False),
+            patch.object(settings, "EMAILS_FROM_EMAIL", "noreply@example.com"),
+        ):
+            samples = measure(send, args.messages)
+            smtp_transport.close()
+        quantiles = statistics.quantiles(samples, n=100)
+        print(
+            f"{name:<10} {quantiles[49] * 1000:>8.3f} {quantiles[94] * 1000:>8.3f}"
+            f" {sum(samples):>8.3f} {sink.stats.connections:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compare sustained insert rate and index size for UUIDv4 and UUIDv7 keys.
+
+Run against the configured database with:
+
+    python -m app.benchmarks.uuid_keys --rows 10000000 --batch-size 100000
+
+Each key version gets a scratch copy of the item table, with the primary key
+and the (owner_id, id) index, which is filled with COPY in committed batches.
+Items are spread over ``--owners`` random owners. The sustained rate is the
+rate of the last 10% of batches, once the indexes no longer fit in cache as
+easily; index hit ratios come from pg_statio_user_indexes. The tables are
+dropped afterwards.
+"""
+
+import argparse
+import random
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import text
+
+from app.core.db_factory import get_engine
+from app.core.uuid7 import uuid7
+
+GENERATORS: dict[str, Callable[[], uuid.UUID]] = {"v4": uuid.uuid4, "v7": uuid7}
+
+
+def measure(
+    version: str, rows: int, batch_size: int, owners: int
+) -> tuple[list[float], int, int, float]:
+    table = f"bench_item_{version}"
+    generate_id = GENERATORS[version]
+    owner_ids = [uuid.uuid4() for _ in range(owners)]
+    with get_engine().connect() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        connection.execute(
+            text(
+                f"CREATE TABLE {table} (id uuid PRIMARY KEY, owner_id uuid NOT NULL,"
+                f" title varchar(255) NOT NULL)"
+            )
+        )
+        connection.execute(
+            text(f"CREATE INDEX {table}_owner_id_id ON {table} (owner_id, id)")
+        )
+        connection.commit()
+
+        dbapi_connection: Any = connection.connection.driver_connection
+        rates: list[float] = []
+        for start in range(0, rows, batch_size):
+            count = min(batch_size, rows - start)
+            started = time.perf_counter()
+            with dbapi_connection.cursor() as cursor:
+                with cursor.copy(
+                    f"COPY {table} (id, owner_id, title) FROM STDIN"
+                ) as copy:
+                    for n in range(count):
+                        copy.write_row(
+                            (generate_id(), random.choice(owner_ids), f"Item {n}")
+                        )
+            dbapi_connection.commit()
+            rates.append(count / (time.perf_counter() - started))
+
+        pkey_size, owner_index_size = connection.execute(
+            text(
+                f"SELECT pg_relation_size('{table}_pkey'),"
+                f" pg_relation_size('{table}_owner_id_id')"
+            )
+        ).one()
+        hits, reads = connection.execute(
+            text(
+                "SELECT sum(idx_blks_hit), sum(idx_blks_read)"
+                " FROM pg_statio_user_indexes WHERE relname = :table"
+            ),
+            {"table": table},
+        ).one()
+        connection.execute(text(f"DROP TABLE {table}"))
+        connection.commit()
+    hit_ratio = hits / (hits + reads) if hits + reads else 1.0
+    return rates, pkey_size, owner_index_size, hit_ratio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--owners", type=int, default=1000)
+    parser.add_argument("--version", choices=list(GENERATORS), action="append")
+    args = parser.parse_args()
+
+    print(
+        f"{'key':<4} {'rows':>10} {'rows/s':>9} {'last 10%':>9}"
+        f" {'pkey MB':>8} {'owner MB':>9} {'idx hit':>8}"
+    )
+    for version in args.version or list(GENERATORS):
+        rates, pkey_size, owner_index_size, hit_ratio = measure(
+            version, args.rows, args.batch_size, args.owners
+        )
+        tail = rates[-max(1, len(rates) // 10) :]
+        overall = len(rates) / sum(1 / rate for rate in rates)
+        sustained = len(tail) / sum(1 / rate for rate in tail)
+        print(
+            f"{version:<4} {args.rows:>10} {overall:>9.0f} {sustained:>9.0f}"
+            f" {pkey_size / 2**20:>8.1f} {owner_index_size / 2**20:>9.1f}"
+            f" {hit_ratio:>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
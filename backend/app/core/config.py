@@ -1,6 +1,7 @@
 import logging
 import os
 import secrets
+import tempfile
 import warnings
 from typing import Annotated, Any, ClassVar, Literal
 
@@ -44,7 +45,38 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Resolved principals (id, is_active, is_superuser) are cached per process
+    # so authenticated requests do not need a user lookup every time.
+    # Set the TTL to 0 to disable the cache.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    # bcrypt runs in a separate process pool; 0 processes hashes inline.
+    # Requests beyond MAX_PENDING wait up to the queue timeout, then get a 503.
+    PASSWORD_HASHER_PROCESSES: int = 2
+    PASSWORD_HASHER_MAX_PENDING: int = 16
+    PASSWORD_HASHER_QUEUE_TIMEOUT_SECONDS: float = 0.5
     FRONTEND_HOST: str = "http://localhost:5173"
+    # Upper bound for the `limit` query parameter of list endpoints
+    PAGINATION_MAX_LIMIT: int = 1000
+    # Directory for the per-row error files written by item imports
+    ITEMS_IMPORT_ERRORS_DIR: str = os.path.join(
+        tempfile.gettempdir(), "item-import-errors"
+    )
+    # Error files older than this are no longer served and are deleted by the
+    # next import
+    ITEMS_IMPORT_ERRORS_RETENTION_SECONDS: float = 86400
+    # Users owning more items than the threshold are deleted by a background
+    # purge that removes their items in chunks, one transaction per chunk
+    USER_PURGE_SYNC_THRESHOLD: int = 1000
+    USER_PURGE_CHUNK_SIZE: int = 1000
+    # A running purge that commits no chunk for this long is presumed dead and
+    # resumed by the worker process, which looks for such purges every interval
+    USER_PURGE_LEASE_SECONDS: float = 300
+    USER_PURGE_POLL_INTERVAL_SECONDS: float = 60
+    # Bearer token Prometheus must send to GET /utils/metrics/, unset disables it
+    METRICS_TOKEN: str | None = None
+    # Count strategy used by list endpoints when the request does not pass one
+    LIST_COUNT_STRATEGY: Literal["exact", "estimated", "none"] = "exact"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
     BACKEND_CORS_ORIGINS: Annotated[
@@ -63,6 +95,33 @@ class Settings(BaseSettings):
 
     # Database configuration
     DATABASE_TYPE: Literal["postgres", "supabase"] = "postgres"
+    # Connection pool of each engine, every process shares one engine per database.
+    # "auto" uses a tiny LIFO pool behind a transaction-mode pooler and a queue
+    # pool otherwise; "null" opens a connection per checkout.
+    DATABASE_POOL_STRATEGY: Literal["auto", "queue", "lifo", "null"] = "auto"
+    # Number of worker processes per instance, as read by uvicorn and gunicorn
+    WEB_CONCURRENCY: int = 1
+    # Persistent connections per instance, split between its workers unless
+    # DATABASE_POOL_SIZE sets the per-process size directly
+    DATABASE_POOL_BUDGET: int = 5
+    DATABASE_POOL_SIZE: int | None = None
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_RECYCLE_SECONDS: int = 300
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30
+    # Connections idle in the pool for at least this long are pinged at checkout
+    DATABASE_POOL_IDLE_CHECK_SECONDS: float = 30
+    # Optional SQLAlchemy URLs (postgresql+psycopg://...) of the named replica and
+    # analytics engines, unset engines share the primary one
+    DATABASE_REPLICA_URL: str | None = None
+    DATABASE_ANALYTICS_URL: str | None = None
+    # Send per-request query count and database time in a Server-Timing header
+    SERVER_TIMING_ENABLED: bool = True
+    # Log a possible N+1 when a request repeats one statement more often than
+    # this, 0 disables the check
+    DATABASE_N_PLUS_ONE_THRESHOLD: int = 10
+    # Serve the login and item CRUD routes with async handlers on an AsyncEngine,
+    # so their concurrency is bounded by the connection pool, not the threadpool
+    DATABASE_ASYNC: bool = False
 
     # Supabase configuration - these will not be used when using postgres database type
     SUPABASE_URL: str | None = None
@@ -129,6 +188,13 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = None
     EMAILS_FROM_EMAIL: EmailStr | None = None
     EMAILS_FROM_NAME: EmailStr | None = None
+    SMTP_TIMEOUT_SECONDS: float = 10
+    # Authenticated SMTP sessions are pooled per server and reused across
+    # messages. Sessions idle past the timeout are closed, and sessions idle
+    # past the health check interval are probed with NOOP before reuse.
+    SMTP_POOL_SIZE: int = 2
+    SMTP_POOL_IDLE_TIMEOUT_SECONDS: float = 60
+    SMTP_POOL_HEALTH_CHECK_SECONDS: float = 5
 
     @model_validator(mode="after")
     def _set_default_emails_from(self) -> Self:
@@ -137,6 +203,19 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # Compiled email templates are cached on disk so new workers skip compiling
+    # them, unset to keep the cache in memory only
+    EMAIL_TEMPLATES_CACHE_DIR: str | None = "/tmp/email-templates-cache"
+    # Emails are queued in the outbox table and delivered by `python -m app.worker`.
+    # Failed sends are retried with exponential backoff until the attempts run out.
+    EMAIL_OUTBOX_BATCH_SIZE: int = 10
+    EMAIL_OUTBOX_POLL_INTERVAL_SECONDS: float = 2
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = 30
+    EMAIL_OUTBOX_MAX_BACKOFF_SECONDS: float = 3600
+    # Sent and failed emails are deleted once this old, their content may hold
+    # password reset links
+    EMAIL_OUTBOX_RETENTION_SECONDS: float = 86400
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -151,6 +230,25 @@ class Settings(BaseSettings):
     POSTHOG_API_KEY: str | None = None
     POSTHOG_HOST: str = "https://app.posthog.com"
     POSTHOG_CAPTURE_PERSONAL_INFO: bool = False
+    # API requests are sampled into a ring buffer and sent as per-route
+    # summaries every flush interval. Per-route rates are keyed by route path,
+    # e.g. {"/api/v1/utils/health-check/": 0}
+    POSTHOG_SAMPLE_RATE: float = 1.0
+    POSTHOG_ROUTE_SAMPLE_RATES: dict[str, float] = {}
+    POSTHOG_BUFFER_SIZE: int = 10_000
+    POSTHOG_FLUSH_INTERVAL_SECONDS: float = 10
+    # Events are spooled to disk and replayed to PostHog by a background drain,
+    # so a slow or unreachable host does not grow worker memory. Point the
+    # directory at a volume for the spool to survive container restarts.
+    POSTHOG_SPOOL_DIR: str = "/tmp/posthog-spool"
+    POSTHOG_SPOOL_SEGMENT_BYTES: int = 1024 * 1024
+    POSTHOG_SPOOL_MAX_BYTES: int = 64 * 1024 * 1024
+    POSTHOG_SPOOL_FSYNC_EVERY: int = 100
+    POSTHOG_SPOOL_FSYNC_INTERVAL_SECONDS: float = 1
+    POSTHOG_SPOOL_BATCH_SIZE: int = 100
+    POSTHOG_SPOOL_DRAIN_INTERVAL_SECONDS: float = 5
+    POSTHOG_SPOOL_MAX_BACKOFF_SECONDS: float = 300
+    POSTHOG_TIMEOUT_SECONDS: int = 15
 
     @computed_field  # type: ignore[prop-decorator]
     @property
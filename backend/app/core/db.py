@@ -4,16 +4,11 @@ from sqlmodel import Session, select
 
 from app import crud
 from app.core.config import settings
-from app.core.db_factory import create_db_engine
 from app.models import User, UserCreate
 
 # Get the logger
 logger = logging.getLogger("app.db")
 
-# Use db_factory to create the engine
-engine = create_db_engine()
-
-
 # make sure all SQLModel models are imported (app.models) before initializing DB
 # otherwise, SQLModel might fail to initialize relationships properly
 # for more details: https://github.com/fastapi/full-stack-fastapi-template/issues/28
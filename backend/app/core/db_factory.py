@@ -1,14 +1,23 @@
 import logging
-from typing import Any
+import threading
+import time
+from typing import Any, Literal
 from typing import Any as AnyType
 
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import ConnectionPoolEntry, NullPool
 from sqlmodel import create_engine
 
 from app.core.config import settings
+from app.core.db_instrumentation import instrument_engine
 
 # Get the logger
 logger = logging.getLogger("app.db_factory")
 
+PoolStrategy = Literal["queue", "lifo", "null"]
+
 
 def get_engine_args() -> dict[str, Any]:
     """Returns engine arguments based on the database type.
@@ -83,11 +92,21 @@ def get_db_url() -> str:
     return url
 
 
-def create_db_engine() -> AnyType:
+def create_db_engine(
+    url: str | None = None,
+    strategy: PoolStrategy | None = None,
+    name: str = "primary",
+) -> AnyType:
     """Creates and returns a configured database engine.
 
     This function retrieves the necessary arguments for creating the database engine, configures connection pooling
-    parameters, constructs the database URL, and then creates and returns the engine.
+    parameters, constructs the database URL, and then creates and returns the engine. Prefer ``get_engine``, which
+    shares one engine per process.
+
+    Args:
+        url (str | None): The database URL, defaults to the primary database from ``get_db_url``.
+        strategy (PoolStrategy | None): The pool strategy, defaults to ``get_pool_strategy()``.
+        name (str): The name the engine's metrics are labelled with.
 
     Returns:
         sqlalchemy.engine.Engine: The configured database engine.
@@ -95,21 +114,191 @@ def create_db_engine() -> AnyType:
     engine_args = get_engine_args()
 
     # Add connection pool configuration
-    engine_args.update(
-        {
-            "pool_pre_ping": True,  # Ping before connection to ensure connection is usable
-            "pool_recycle": 300,  # Maximum lifetime of a connection in the pool (seconds)
-            "pool_size": 5,  # Connection pool size
-            "max_overflow": 10,  # Number of additional connections allowed to be created when the pool overflows
-        }
-    )
+    engine_args.update(get_pool_args(strategy))
 
     # Get the correct database URL
-    url = get_db_url()
+    url = url or get_db_url()
 
     # 返回任意类型，不要指定具体类型
-    return create_engine(url, **engine_args)
+    engine = create_engine(url, **engine_args)
+    add_idle_check(engine)
+    instrument_engine(engine, name)
+    return engine
+
+
+def get_pool_strategy() -> PoolStrategy:
+    """Returns the configured pool strategy, resolving ``auto`` from the pooler mode.
+
+    Behind a transaction-mode pooler, server connections are multiplexed by the
+    pooler itself, so only a tiny LIFO pool is kept client side. Session mode
+    and direct connections get a regular queue pool.
+    """
+    if settings.DATABASE_POOL_STRATEGY != "auto":
+        return settings.DATABASE_POOL_STRATEGY
+    if (
+        settings.DATABASE_TYPE == "supabase"
+        and settings.SUPABASE_DB_POOL_MODE == "transaction"
+    ):
+        return "lifo"
+    return "queue"
+
+
+def get_pool_size() -> int:
+    """Returns the persistent pool size of one worker process.
+
+    Unless set explicitly, the connection budget of an instance is split between
+    its ``WEB_CONCURRENCY`` worker processes.
+    """
+    if settings.DATABASE_POOL_SIZE is not None:
+        return settings.DATABASE_POOL_SIZE
+    return max(1, settings.DATABASE_POOL_BUDGET // max(1, settings.WEB_CONCURRENCY))
+
+
+def get_pool_args(strategy: PoolStrategy | None = None) -> dict[str, Any]:
+    """Returns the connection pool configuration shared by the sync and async engines.
+
+    Pre-ping is never enabled, it costs a round trip on every checkout. Stale
+    connections are instead handled by ``pool_recycle`` and ``add_idle_check``.
+    """
+    strategy = strategy or get_pool_strategy()
+    if strategy == "null":
+        # Open a connection per checkout and let the pooler do all the pooling
+        return {"poolclass": NullPool}
+
+    pool_args: dict[str, Any] = {
+        "pool_pre_ping": False,
+        # Maximum lifetime of a connection in the pool (seconds)
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE_SECONDS,
+        # Connection pool size
+        "pool_size": get_pool_size(),
+        # Number of additional connections allowed to be created when the pool overflows
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        # Seconds to wait for a connection before giving up
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+    }
+    if strategy == "lifo":
+        # Reuse the most recent connection so surplus ones go idle and get
+        # closed, and keep at most two around between requests
+        pool_args["pool_size"] = min(pool_args["pool_size"], 2)
+        pool_args["pool_use_lifo"] = True
+    return pool_args
+
+
+def add_idle_check(engine: Engine) -> None:
+    """Ping connections at checkout only if they sat idle in the pool for long.
+
+    Poolers and firewalls drop idle connections, fresh ones are almost always
+    alive. Connections idle for ``DATABASE_POOL_IDLE_CHECK_SECONDS`` or more are
+    checked with ``SELECT 1`` and replaced if that fails.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _record_checkin(_dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _check_idle(
+        dbapi_connection: Any, record: ConnectionPoolEntry, _proxy: Any
+    ) -> None:
+        checked_in_at = record.info.get("checked_in_at")
+        idle = time.monotonic() - checked_in_at if checked_in_at else 0.0
+        if idle < settings.DATABASE_POOL_IDLE_CHECK_SECONDS:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+            dbapi_connection.rollback()
+        except Exception as e:
+            logger.info(f"Replacing connection idle for {idle:.0f}s: {e}")
+            raise DisconnectionError() from e
+
+
+def create_async_db_engine(
+    url: str | None = None,
+    strategy: PoolStrategy | None = None,
+    name: str = "primary",
+) -> AsyncEngine:
+    """Creates the async counterpart of the engine returned by ``create_db_engine``.
+
+    psycopg 3 provides both a sync and an async driver, so the same URL is used and
+    SQLAlchemy selects the async dialect. Connecting is deferred to first use.
+
+    Returns:
+        AsyncEngine: The configured async database engine.
+    """
+    engine_args = get_engine_args()
+    engine_args.update(get_pool_args(strategy))
+    async_engine = create_async_engine(url or get_db_url(), **engine_args)
+    add_idle_check(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine, f"{name}-async")
+    return async_engine
+
+
+EngineName = Literal["primary", "replica", "analytics"]
+
+
+def get_named_db_url(name: EngineName) -> str | None:
+    """Returns the URL configured for a named engine, None if it shares the primary."""
+    if name == "replica":
+        return settings.DATABASE_REPLICA_URL
+    if name == "analytics":
+        return settings.DATABASE_ANALYTICS_URL
+    return None
+
+
+class EngineRegistry:
+    """Process-wide registry of lazily created engines.
+
+    Every consumer resolves its engine here, so a process holds one pool per
+    configured database instead of one per importing module. Named engines
+    without their own URL share the primary engine and its pool.
+    """
+
+    def __init__(self) -> None:
+        self._engines: dict[str, Engine] = {}
+        self._async_engines: dict[str, AsyncEngine] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: EngineName = "primary") -> Engine:
+        url = get_named_db_url(name)
+        key = name if url else "primary"
+        with self._lock:
+            if key not in self._engines:
+                self._engines[key] = create_db_engine(url, name=key)
+                logger.info(f"Created {key} database engine")
+            return self._engines[key]
+
+    def get_async(self, name: EngineName = "primary") -> AsyncEngine:
+        url = get_named_db_url(name)
+        key = name if url else "primary"
+        with self._lock:
+            if key not in self._async_engines:
+                self._async_engines[key] = create_async_db_engine(url, name=key)
+                logger.info(f"Created async {key} database engine")
+            return self._async_engines[key]
+
+    async def dispose(self) -> None:
+        """Close all pooled connections and forget the engines."""
+        with self._lock:
+            engines = list(self._engines.values())
+            async_engines = list(self._async_engines.values())
+            self._engines.clear()
+            self._async_engines.clear()
+        for engine in engines:
+            engine.dispose()
+        for async_engine in async_engines:
+            await async_engine.dispose()
+
+
+engines = EngineRegistry()
+
+
+def get_engine(name: EngineName = "primary") -> Engine:
+    return engines.get(name)
 
 
-# Create engine instance
-engine = create_db_engine()
+def get_async_engine(name: EngineName = "primary") -> AsyncEngine:
+    return engines.get_async(name)
@@ -0,0 +1,202 @@
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+from app.core.metrics import (
+    db_pool_checked_out,
+    db_pool_checkout_wait,
+    db_pool_overflow,
+)
+
+logger = logging.getLogger("app.db_instrumentation")
+
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a statement to its shape, so repeated lookups compare equal."""
+    statement = _LITERAL_PATTERN.sub("?", statement)
+    return _WHITESPACE_PATTERN.sub(" ", statement).strip()
+
+
+@dataclass
+class QueryStats:
+    """Database activity of one request."""
+
+    queries: int = 0
+    db_time: float = 0.0
+    checkout_wait: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: str | None = None
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def record_query(self, statement: str, duration: float) -> None:
+        self.queries += 1
+        self.db_time += duration
+        self.statements[normalize_statement(statement)] += 1
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements issued more than ``threshold`` times, the N+1 suspects."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count > threshold
+        ]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;desc="{self.queries} queries";dur={self.db_time * 1000:.3f}, '
+            f"db-checkout;dur={self.checkout_wait * 1000:.3f}, "
+            f"db-slowest;dur={self.slowest_time * 1000:.3f}"
+        )
+
+
+# Set per request by the query stats middleware. Sync dependencies and routes
+# run in a copy of the request context, so the stats object is mutated rather
+# than replaced.
+_current_stats: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the database activity of everything run inside the block."""
+    stats = QueryStats()
+    reset_token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(reset_token)
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    checkout_wait: float = 0.0
+    max_db_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: str | None = None
+
+
+class RouteQueryStats:
+    """Process-wide totals of the per-request query stats, keyed by route."""
+
+    def __init__(self) -> None:
+        self._routes: dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def add(self, route: str, stats: QueryStats) -> None:
+        with self._lock:
+            totals = self._routes.setdefault(route, RouteStats())
+            totals.requests += 1
+            totals.queries += stats.queries
+            totals.db_time += stats.db_time
+            totals.checkout_wait += stats.checkout_wait
+            totals.max_db_time = max(totals.max_db_time, stats.db_time)
+            if stats.slowest_time > totals.slowest_time:
+                totals.slowest_time = stats.slowest_time
+                totals.slowest_statement = stats.slowest_statement
+
+    def snapshot(self) -> dict[str, RouteStats]:
+        with self._lock:
+            return {
+                route: RouteStats(**vars(totals))
+                for route, totals in self._routes.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_query_stats = RouteQueryStats()
+
+
+def instrument_engine(engine: Engine, name: str = "primary") -> None:
+    """Report statement timings and pool checkout waits to the current request.
+
+    The checkout wait is the time spent in ``raw_connection``, which covers
+    waiting on a full pool, opening new connections and the idle check. Pool
+    usage is also exported as metrics labelled with the engine ``name``.
+    """
+    raw_connection = engine.raw_connection
+    checkout_wait = db_pool_checkout_wait.labels(engine=name)
+    checked_out = db_pool_checked_out.labels(engine=name)
+    overflow = db_pool_overflow.labels(engine=name)
+
+    def timed_raw_connection() -> Any:
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            waited = time.perf_counter() - started
+            checkout_wait.observe(waited)
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.checkout_wait += waited
+
+    def update_pool_gauges() -> None:
+        # NullPool keeps no connections and has no overflow
+        pool_overflow = getattr(engine.pool, "overflow", None)
+        if pool_overflow is not None:
+            overflow.set(max(0, pool_overflow()))
+
+    @event.listens_for(engine, "checkout")
+    def _count_checkout(*_args: Any) -> None:
+        checked_out.inc()
+        update_pool_gauges()
+
+    @event.listens_for(engine, "checkin")
+    def _count_checkin(*_args: Any) -> None:
+        checked_out.dec()
+        update_pool_gauges()
+
+    # Connection objects fetch their DBAPI connection through this method
+    engine.raw_connection = timed_raw_connection  # type: ignore[method-assign]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn: Any, *_args: Any) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+        duration = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record_query(statement, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(context: Any) -> None:
+        started = (
+            context.connection.info.get("query_started") if context.connection else None
+        )
+        if started:
+            started.pop()
+
+
+def report_repeated_statements(route: str, stats: QueryStats) -> None:
+    """Log statements a request issued more often than the N+1 threshold."""
+    threshold = settings.DATABASE_N_PLUS_ONE_THRESHOLD
+    if threshold <= 0:
+        return
+    for statement, count in stats.repeated_statements(threshold):
+        logger.warning(
+            f"Possible N+1 query in {route}: {count} similar statements: {statement}"
+        )
@@ -0,0 +1,147 @@
+import logging
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session, func
+
+from app import crud
+from app.core.config import settings
+from app.core.db_factory import get_engine
+from app.models import EmailOutbox
+from app.utils import send_email
+from app.utils.smtp_transport import SMTPSession, smtp_transport
+
+logger = logging.getLogger("app.email_outbox")
+
+# Expired emails are deleted in batches of this size, this often
+PURGE_BATCH_SIZE = 1000
+PURGE_INTERVAL_SECONDS = 600
+
+
+class EmailOutboxWorker:
+    """Delivers queued emails, retrying failed sends with exponential backoff.
+
+    Each batch is claimed with ``FOR UPDATE SKIP LOCKED`` and its outcome is
+    committed in the same transaction, so any number of workers can run side by
+    side without sending an email twice. A worker that dies mid-batch releases
+    its locks and the batch is retried, so delivery is at least once. Sent and
+    failed emails are deleted ``retention`` seconds after they were queued.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        backoff: float,
+        max_backoff: float,
+        retention: float,
+    ) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retention = retention
+
+    def run_once(self) -> int:
+        """Send one batch of due emails, returning how many were claimed."""
+        with Session(get_engine()) as session:
+            emails = crud.claim_outbox_emails(session=session, limit=self.batch_size)
+            if emails:
+                self._deliver_batch(emails)
+                session.add_all(emails)
+            session.commit()
+        return len(emails)
+
+    def purge_expired(self) -> int:
+        """Delete the sent and failed emails older than the retention period."""
+        purged = 0
+        with Session(get_engine()) as session:
+            while deleted := crud.delete_outbox_emails(
+                session=session,
+                older_than=timedelta(seconds=self.retention),
+                limit=PURGE_BATCH_SIZE,
+            ):
+                purged += deleted
+        if purged:
+            logger.info(f"Purged {purged} delivered emails from the outbox")
+        return purged
+
+    def run(self, stop: threading.Event) -> None:
+        next_purge = 0.0
+        while not stop.is_set():
+            if time.monotonic() >= next_purge:
+                try:
+                    self.purge_expired()
+                except Exception:
+                    logger.exception("Failed to purge the email outbox")
+                next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+            try:
+                claimed = self.run_once()
+            except Exception:
+                logger.exception("Failed to process the email outbox")
+                claimed = 0
+            # A full batch suggests more is due, so only idle after a short one
+            if claimed < self.batch_size:
+                stop.wait(self.poll_interval)
+
+    def _deliver_batch(self, emails: list[EmailOutbox]) -> None:
+        # The whole batch goes out over one SMTP session
+        attempted: set[uuid.UUID] = set()
+        try:
+            with smtp_transport.session() as smtp:
+                for email in emails:
+                    attempted.add(email.id)
+                    self._deliver(email, smtp)
+        except Exception as e:
+            # Typically the session could not be opened
+            for email in emails:
+                if email.id not in attempted:
+                    self._record_failure(email, e)
+
+    def _deliver(self, email: EmailOutbox, smtp: SMTPSession) -> None:
+        try:
+            response = send_email(
+                email_to=email.email_to,
+                subject=email.subject,
+                html_content=email.html_content,
+                session=smtp,
+            )
+            # Only a 250 reply to the message means the server took it, whether
+            # or not the transport raised for the failure
+            if not getattr(response, "success", False):
+                raise smtplib.SMTPException(f"Message not accepted: {response!r}")
+        except Exception as e:
+            self._record_failure(email, e)
+            return
+        email.attempts += 1
+        email.status = "sent"
+        email.sent_at = datetime.now(timezone.utc)
+
+    def _record_failure(self, email: EmailOutbox, error: Exception) -> None:
+        email.attempts += 1
+        email.last_error = repr(error)
+        if email.attempts >= self.max_attempts:
+            email.status = "failed"
+            logger.error(f"Giving up on email {email.id}: {error!r}")
+            return
+        delay = min(self.max_backoff, self.backoff * 2 ** (email.attempts - 1))
+        # Due by the database clock claim_outbox_emails compares it with, the
+        # expression is evaluated by the UPDATE that flushes the email
+        email.next_attempt_at = func.now() + timedelta(seconds=delay)  # type: ignore[assignment]
+        logger.warning(f"Email {email.id} failed, retrying in {delay:.0f}s: {error!r}")
+
+
+email_outbox_worker = EmailOutboxWorker(
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    backoff=settings.EMAIL_OUTBOX_BACKOFF_SECONDS,
+    max_backoff=settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS,
+    retention=settings.EMAIL_OUTBOX_RETENTION_SECONDS,
+)
@@ -0,0 +1,120 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With PROMETHEUS_MULTIPROC_DIR set, every worker process writes its samples to
+# memory-mapped files in that directory and a scrape of any worker aggregates
+# all of them. The directory must be emptied before the workers start.
+MULTIPROCESS_ENABLED = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+if MULTIPROCESS_ENABLED:
+    # Only the web command empties and creates it, prestart and the worker
+    # process import the metrics too
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route id",
+    ["route", "method", "status"],
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries",
+    "Database statements issued per request by route id",
+    ["route", "method"],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250),
+)
+http_request_db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing database statements per request by route id",
+    ["route", "method"],
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being served",
+    multiprocess_mode="livesum",
+)
+threadpool_threads_busy = Gauge(
+    "threadpool_threads_busy",
+    "Threadpool threads running sync routes and dependencies",
+    multiprocess_mode="livesum",
+)
+threadpool_threads_total = Gauge(
+    "threadpool_threads_total",
+    "Threadpool capacity",
+    multiprocess_mode="livesum",
+)
+db_pool_checked_out = Gauge(
+    "db_pool_connections_checked_out",
+    "Connections currently checked out of the pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+db_pool_overflow = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent acquiring a connection from the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+password_hasher_operations = Counter(
+    "password_hasher_operations",
+    "bcrypt hashes and verifications run",
+    ["operation"],
+)
+password_hasher_queue_depth = Gauge(
+    "password_hasher_queue_depth",
+    "Password operations queued or running in the hasher",
+    multiprocess_mode="livesum",
+)
+password_hasher_duration = Histogram(
+    "password_hasher_duration_seconds",
+    "Time from admission to result of a password operation",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+password_hasher_rejected = Counter(
+    "password_hasher_rejected",
+    "Password operations rejected because the queue was full",
+)
+principal_cache_lookups = Counter(
+    "principal_cache_lookups",
+    "Principal cache lookups by result",
+    ["result"],
+)
+analytics_events_dropped = Counter(
+    "analytics_events_dropped",
+    "Analytics events discarded because the spool was full",
+)
+email_send_duration = Histogram(
+    "email_send_duration_seconds",
+    "Time spent delivering an email to the SMTP server",
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text format with its content type."""
+    if MULTIPROCESS_ENABLED:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop the live gauges of this process, called when a worker shuts down."""
+    if MULTIPROCESS_ENABLED:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
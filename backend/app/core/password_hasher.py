@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core import security
+from app.core.config import settings
+from app.core.metrics import (
+    password_hasher_duration,
+    password_hasher_operations,
+    password_hasher_queue_depth,
+    password_hasher_rejected,
+)
+
+logger = logging.getLogger("app.password_hasher")
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Raised when the hashing queue is full and the caller should retry later."""
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification in a dedicated process pool.
+
+    bcrypt is CPU bound and holds the GIL, so running it on the request
+    threadpool slows down every other request served by the worker. Offloading
+    it keeps the API process responsive, and the bounded queue makes a login
+    storm fail fast with ``PasswordHasherBusyError`` instead of tying up threads.
+
+    With ``processes=0`` the work runs inline in the calling thread, or in the
+    threadpool for async callers. Sync and async callers are admitted the same
+    way: they wait up to ``queue_timeout`` for a slot, async callers doing so
+    off the event loop.
+    """
+
+    def __init__(
+        self, *, processes: int, max_pending: int, queue_timeout: float
+    ) -> None:
+        self.processes = processes
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._peak_pending = 0
+        self._operations = 0
+        self._rejected = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def hash(self, password: str) -> str:
+        password_hasher_operations.labels(operation="hash").inc()
+        return self._run(security.get_password_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        password_hasher_operations.labels(operation="verify").inc()
+        return self._run(security.verify_password, plain_password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        password_hasher_operations.labels(operation="hash").inc()
+        return await self._run_async(security.get_password_hash, password)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        password_hasher_operations.labels(operation="verify").inc()
+        return await self._run_async(
+            security.verify_password, plain_password, hashed_password
+        )
+
+    def stats(self) -> dict[str, float]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._pending,
+                "queue_peak": self._peak_pending,
+                "operations": self._operations,
+                "rejected": self._rejected,
+                "latency_seconds_total": self._total_latency,
+                "latency_seconds_max": self._max_latency,
+            }
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Use spawn so worker processes never inherit locks held by
+                # server threads at fork time.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"Started password hasher with {self.processes} processes")
+            return self._executor
+
+    def _acquire(self, timeout: float) -> None:
+        if not self._slots.acquire(timeout=timeout):
+            with self._stats_lock:
+                self._rejected += 1
+            password_hasher_rejected.inc()
+            raise PasswordHasherBusyError("Password hashing queue is full")
+        self._admitted()
+
+    async def _acquire_async(self) -> None:
+        if self._slots.acquire(blocking=False):
+            self._admitted()
+            return
+        # Only wait for a slot in a worker thread, never on the event loop
+        await run_in_threadpool(self._acquire, self.queue_timeout)
+
+    def _admitted(self) -> None:
+        with self._stats_lock:
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+        password_hasher_queue_depth.inc()
+
+    def _release(self, started: float) -> None:
+        latency = time.perf_counter() - started
+        self._slots.release()
+        with self._stats_lock:
+            self._pending -= 1
+            self._operations += 1
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+        password_hasher_queue_depth.dec()
+        password_hasher_duration.observe(latency)
+
+    def _submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        return self._get_executor().submit(fn, *args)
+
+    def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        self._acquire(self.queue_timeout)
+        started = time.perf_counter()
+        try:
+            if self.processes <= 0:
+                return fn(*args)
+            return self._submit(fn, *args).result()
+        finally:
+            self._release(started)
+
+    async def _run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        await self._acquire_async()
+        started = time.perf_counter()
+        try:
+            if self.processes <= 0:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.wrap_future(self._submit(fn, *args))
+        finally:
+            self._release(started)
+
+
+password_hasher = PasswordHasher(
+    processes=settings.PASSWORD_HASHER_PROCESSES,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING,
+    queue_timeout=settings.PASSWORD_HASHER_QUEUE_TIMEOUT_SECONDS,
+)
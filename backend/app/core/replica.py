@@ -0,0 +1,124 @@
+import contextvars
+import logging
+import re
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db_factory import get_engine
+
+logger = logging.getLogger("app.replica")
+
+CONSISTENCY_TOKEN_HEADER = "X-Consistency-Token"
+
+_LSN_PATTERN = re.compile(r"^([0-9A-Fa-f]{1,8})/([0-9A-Fa-f]{1,8})$")
+
+
+def parse_lsn(value: str) -> int:
+    """Parse a PostgreSQL LSN such as ``16/B374D848`` into a comparable integer.
+
+    Raises:
+        ValueError: if the value is not an LSN.
+    """
+    match = _LSN_PATTERN.match(value)
+    if not match:
+        raise ValueError(value)
+    return (int(match.group(1), 16) << 32) | int(match.group(2), 16)
+
+
+@dataclass
+class _WriteTracker:
+    committed: bool = False
+
+
+# Set per request by the consistency middleware. Sync dependencies run in a copy
+# of the request context, so the tracker is mutated rather than replaced.
+_write_tracker: contextvars.ContextVar[_WriteTracker | None] = contextvars.ContextVar(
+    "write_tracker", default=None
+)
+
+
+@contextmanager
+def track_writes() -> Iterator[_WriteTracker]:
+    """Record whether any session commits while the block runs."""
+    tracker = _WriteTracker()
+    reset_token = _write_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _write_tracker.reset(reset_token)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed(_session: Session) -> None:
+    tracker = _write_tracker.get()
+    if tracker is not None:
+        tracker.committed = True
+
+
+class ReplicaRouter:
+    """Chooses between the primary and the replica engine for reads.
+
+    Writes return the primary's WAL position as a consistency token. A read that
+    presents a token is served by the replica only once it has replayed up to
+    that position, otherwise it falls back to the primary. The highest replayed
+    position seen so far is remembered, so a replica that is known to have
+    caught up is not asked again.
+    """
+
+    def __init__(self) -> None:
+        self._replayed_lsn = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.DATABASE_REPLICA_URL)
+
+    def primary_lsn(self) -> str:
+        with get_engine().connect() as connection:
+            lsn = connection.execute(text("SELECT pg_current_wal_lsn()")).scalar_one()
+        return str(lsn)
+
+    def read_engine(self, token: str | None) -> Engine:
+        """Return the engine a read carrying ``token`` may use.
+
+        Raises:
+            ValueError: if the token is not an LSN.
+        """
+        if not self.enabled:
+            return get_engine()
+        if token is None:
+            return get_engine("replica")
+        required = parse_lsn(token)
+        if required <= self._replayed_lsn or required <= self._replica_lsn():
+            return get_engine("replica")
+        return get_engine()
+
+    def _replica_lsn(self) -> int:
+        try:
+            with get_engine("replica").connect() as connection:
+                # A server that is not in recovery is a primary and is current
+                lsn = connection.execute(
+                    text(
+                        "SELECT CASE WHEN pg_is_in_recovery() "
+                        "THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END"
+                    )
+                ).scalar()
+        except DBAPIError:
+            logger.exception("Could not read the replica replay position")
+            return 0
+        if lsn is None:
+            return 0
+        replayed = parse_lsn(str(lsn))
+        with self._lock:
+            self._replayed_lsn = max(self._replayed_lsn, replayed)
+        return replayed
+
+
+replica_router = ReplicaRouter()
@@ -0,0 +1,85 @@
+import logging
+import threading
+import uuid
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db_factory import get_engine
+from app.models import UserPurge
+
+logger = logging.getLogger("app.user_purge")
+
+
+class UserPurger:
+    """Deletes users with many items in the background, one chunk at a time.
+
+    Each chunk of items is deleted in its own transaction, together with the
+    progress update of the purge's ``userpurge`` row, so a purge never holds
+    row locks on the whole item set and its progress is visible from every
+    worker. A purge whose row goes ``lease`` seconds without progress is
+    presumed dead and picked up again by ``run_pending``, which the worker
+    process runs on a loop; since chunks are committed, it resumes where the
+    dead one stopped.
+    """
+
+    def __init__(self, *, chunk_size: int, lease: float, poll_interval: float) -> None:
+        self.chunk_size = chunk_size
+        self.lease = lease
+        self.poll_interval = poll_interval
+
+    def run(self, user_id: uuid.UUID) -> None:
+        """Run the purge of a user, unless another worker already claimed it."""
+        with Session(get_engine()) as session:
+            job = crud.claim_user_purge(
+                session=session, user_id=user_id, lease=self.lease
+            )
+            if job is not None:
+                self._purge(session, job)
+
+    def run_pending(self) -> int:
+        """Run the pending and abandoned purges, returning how many were run."""
+        purged = 0
+        with Session(get_engine()) as session:
+            while job := crud.claim_user_purge(
+                session=session, user_id=None, lease=self.lease
+            ):
+                self._purge(session, job)
+                purged += 1
+        return purged
+
+    def run_forever(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("Failed to resume user purges")
+            stop.wait(self.poll_interval)
+
+    def _purge(self, session: Session, job: UserPurge) -> None:
+        user_id, total, deleted = job.user_id, job.total, job.deleted
+        try:
+            while chunk := crud.delete_items_chunk(
+                session=session, owner_id=user_id, chunk_size=self.chunk_size
+            ):
+                crud.update_user_purge(session=session, user_id=user_id, deleted=chunk)
+                session.commit()
+                deleted += chunk
+                logger.info(f"Purging user {user_id}: {deleted}/{total} items deleted")
+            crud.update_user_purge(session=session, user_id=user_id, status="done")
+            crud.delete_user(session=session, user_id=user_id)
+        except Exception:
+            logger.exception(f"Purge of user {user_id} failed")
+            session.rollback()
+            crud.update_user_purge(session=session, user_id=user_id, status="failed")
+            session.commit()
+            return
+        logger.info(f"Purged user {user_id}")
+
+
+user_purger = UserPurger(
+    chunk_size=settings.USER_PURGE_CHUNK_SIZE,
+    lease=settings.USER_PURGE_LEASE_SECONDS,
+    poll_interval=settings.USER_PURGE_POLL_INTERVAL_SECONDS,
+)
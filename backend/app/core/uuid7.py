@@ -0,0 +1,43 @@
+import os
+import threading
+import time
+import uuid
+
+
+class UUID7Generator:
+    """Generates time-ordered UUIDv7 values (RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds, so new ids land at the
+    right edge of B-tree indexes instead of on random pages the way UUIDv4 ids
+    do. Within one millisecond the 12-bit ``rand_a`` field counts up from a
+    random start, which keeps the ids of one process strictly increasing; when
+    it overflows the timestamp is advanced by a millisecond. The remaining 62
+    bits are random.
+    """
+
+    def __init__(self) -> None:
+        self._last_ms = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> uuid.UUID:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                # Start in the lower half so a burst has room to count up
+                self._counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+            else:
+                # Same millisecond, or the clock stepped back
+                self._counter += 1
+                if self._counter > 0xFFF:
+                    self._last_ms += 1
+                    self._counter = 0
+            timestamp, counter = self._last_ms, self._counter
+        rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+        return uuid.UUID(
+            int=timestamp << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+        )
+
+
+uuid7 = UUID7Generator()
@@ -1,36 +1,168 @@
 import uuid
-from typing import Any
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Any, TypeVar
 
-from sqlmodel import Session, select
+from psycopg.errors import UniqueViolation
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    ColumnElement,
+    Select,
+    and_,
+    case,
+    cast,
+    column,
+    inspect,
+    or_,
+    table,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, col, delete, func, select
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.core.password_hasher import password_hasher
+from app.core.principal_cache import principal_cache
+from app.core.uuid7 import uuid7
+from app.models import (
+    CountStrategy,
+    EmailOutbox,
+    Item,
+    ItemBulkUpdate,
+    ItemCount,
+    ItemCreate,
+    ItemUpdate,
+    User,
+    UserCreate,
+    UserPurge,
+    UserUpdate,
+    UserUpdateMe,
+)
+
+RowT = TypeVar("RowT", User, Item)
+
+
+def insert_values(db_obj: RowT) -> dict[str, Any]:
+    """The column values to INSERT for a new model.
+
+    None is left out for columns with a server default, so the database fills
+    those in, e.g. timestamps from its own clock.
+    """
+    columns = inspect(type(db_obj), raiseerr=True).columns
+    return {
+        key: value
+        for key, value in db_obj.model_dump().items()
+        if value is not None or columns[key].server_default is None
+    }
+
+
+def insert_returning(*, session: Session, db_obj: RowT) -> RowT:
+    """INSERT the row of a new model and return it as persisted.
+
+    The row comes back from ``INSERT ... RETURNING``, so it reflects server
+    defaults without the SELECT that ``session.refresh`` would issue. Does not
+    commit.
+    """
+    model = type(db_obj)
+    statement = insert(model).values(insert_values(db_obj)).returning(model)
+    return session.scalars(statement).one()
+
+
+def update_returning(*, session: Session, db_obj: RowT, values: dict[str, Any]) -> RowT:
+    """UPDATE the row of ``db_obj`` with ``values`` and return it as persisted.
+
+    ``db_obj`` is updated in place from the ``UPDATE ... RETURNING`` row. Does
+    not commit.
+    """
+    if not values:
+        return db_obj
+    model = type(db_obj)
+    statement = (
+        update(model)
+        .where(col(model.id) == db_obj.id)
+        .values(values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    return session.scalars(statement).one()
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create,
+        update={"hashed_password": password_hasher.hash(user_create.password)},
     )
-    session.add(db_obj)
+    db_obj = insert_returning(session=session, db_obj=db_obj)
     session.commit()
-    session.refresh(db_obj)
     return db_obj
 
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+def create_user_if_absent(*, session: Session, user_create: UserCreate) -> User | None:
+    """INSERT the user unless the email is taken, in one statement, and commit.
+
+    ``ON CONFLICT (email) DO NOTHING`` makes concurrent signups with the same
+    email race inside PostgreSQL rather than fail on the unique index. Returns
+    None, after rolling back the transaction, if the email already exists.
+    """
+    db_obj = User.model_validate(
+        user_create,
+        update={"hashed_password": password_hasher.hash(user_create.password)},
+    )
+    statement = (
+        insert(User)
+        .values(db_obj.model_dump())
+        .on_conflict_do_nothing(index_elements=[col(User.email)])
+        .returning(User)
+    )
+    db_user = session.scalars(statement).one_or_none()
+    if db_user is None:
+        session.rollback()
+        return None
+    session.commit()
+    return db_user
+
+
+def update_user(
+    *, session: Session, db_user: User, user_in: UserUpdate | UserUpdateMe
+) -> User | None:
+    """UPDATE the user and commit.
+
+    Returns None, after rolling back the transaction, if the new email belongs
+    to another user. The unique index decides, so there is no lookup first.
+    """
     user_data = user_in.model_dump(exclude_unset=True)
-    extra_data = {}
     if "password" in user_data:
-        password = user_data["password"]
-        hashed_password = get_password_hash(password)
-        extra_data["hashed_password"] = hashed_password
-    db_user.sqlmodel_update(user_data, update=extra_data)
-    session.add(db_user)
+        password = user_data.pop("password")
+        user_data["hashed_password"] = password_hasher.hash(password)
+    try:
+        db_user = update_returning(session=session, db_obj=db_user, values=user_data)
+    except IntegrityError as exc:
+        if not isinstance(exc.orig, UniqueViolation):
+            raise
+        session.rollback()
+        return None
     session.commit()
-    session.refresh(db_user)
+    principal_cache.invalidate(db_user.id)
     return db_user
 
 
+def delete_user(*, session: Session, user_id: uuid.UUID) -> None:
+    """Delete a user with their items and item counter, then commit.
+
+    Uses set-based DELETEs so no item is loaded into the session. Callers with
+    many items should drain them with ``delete_items_chunk`` first to keep this
+    transaction short.
+    """
+    session.execute(delete(Item).where(col(Item.owner_id) == user_id))
+    session.execute(delete(ItemCount).where(col(ItemCount.owner_id) == user_id))
+    session.execute(delete(User).where(col(User.id) == user_id))
+    session.commit()
+    principal_cache.invalidate(user_id)
+
+
 def get_user_by_email(*, session: Session, email: str) -> User | None:
     statement = select(User).where(User.email == email)
     session_user = session.exec(statement).first()
@@ -41,14 +173,496 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    if not password_hasher.verify(password, db_user.hashed_password):
         return None
     return db_user
 
 
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
-    session.add(db_item)
+    db_item = insert_returning(session=session, db_obj=db_item)
+    adjust_item_count(session=session, owner_id=owner_id, delta=1)
     session.commit()
-    session.refresh(db_item)
     return db_item
+
+
+def owned_item_conditions(
+    *, item_id: uuid.UUID, owner_id: uuid.UUID | None
+) -> list[ColumnElement[bool]]:
+    """WHERE clauses matching the item if ``owner_id`` owns it.
+
+    ``owner_id`` None matches the item whoever owns it, for superusers.
+    """
+    conditions = [col(Item.id) == item_id]
+    if owner_id is not None:
+        conditions.append(col(Item.owner_id) == owner_id)
+    return conditions
+
+
+def item_time_conditions(
+    *, created_after: datetime | None, created_before: datetime | None
+) -> list[ColumnElement[bool]]:
+    """WHERE clauses limiting items to a created_at range, both ends exclusive."""
+    conditions = []
+    if created_after is not None:
+        conditions.append(col(Item.created_at) > created_after)
+    if created_before is not None:
+        conditions.append(col(Item.created_at) < created_before)
+    return conditions
+
+
+def item_exists(*, session: Session, item_id: uuid.UUID) -> bool:
+    """Tell a missing item from one a conditional write was not allowed to touch."""
+    statement = select(Item.id).where(col(Item.id) == item_id)
+    return session.exec(statement).first() is not None
+
+
+def update_item(
+    *,
+    session: Session,
+    item_id: uuid.UUID,
+    owner_id: uuid.UUID | None,
+    item_in: ItemUpdate,
+) -> Item | None:
+    """UPDATE the item if ``owner_id`` owns it and commit.
+
+    The ownership check is part of the ``UPDATE ... RETURNING`` statement, so
+    no SELECT precedes the write. Returns None if no row matched, see
+    ``item_exists``.
+    """
+    conditions = owned_item_conditions(item_id=item_id, owner_id=owner_id)
+    values = item_in.model_dump(exclude_unset=True)
+    if not values:
+        return session.exec(select(Item).where(*conditions)).first()
+    statement = (
+        update(Item)
+        .where(*conditions)
+        .values(values)
+        .returning(Item)
+        .execution_options(populate_existing=True)
+    )
+    db_item = session.scalars(statement).one_or_none()
+    session.commit()
+    return db_item
+
+
+def update_items(
+    *,
+    session: Session,
+    items_in: list[ItemBulkUpdate],
+    owner_id: uuid.UUID | None,
+) -> dict[uuid.UUID, Item]:
+    """UPDATE the items ``owner_id`` owns in one statement and commit.
+
+    The changes are joined in as ``UPDATE item ... FROM (VALUES ...)`` with a
+    flag per field, so a row only overwrites the fields it sets; rows for the
+    same id are merged in order first. The ownership check is part of the
+    WHERE clause. Returns the updated items by id, ids that matched no row are
+    missing, see ``item_exists``.
+    """
+    fields = list(ItemUpdate.model_fields)
+    item_columns = inspect(Item).columns
+    changes_by_id: dict[uuid.UUID, dict[str, Any]] = {}
+    for item_in in items_in:
+        changes_by_id.setdefault(item_in.id, {}).update(
+            item_in.model_dump(exclude_unset=True, exclude={"id"})
+        )
+    changes = values(
+        column("id", item_columns["id"].type),
+        *(column(field, item_columns[field].type) for field in fields),
+        *(column(f"set_{field}", Boolean) for field in fields),
+        name="changes",
+    ).data(
+        [
+            (
+                item_id,
+                *(item_changes.get(field) for field in fields),
+                *(field in item_changes for field in fields),
+            )
+            for item_id, item_changes in changes_by_id.items()
+        ]
+    )
+    assignments: dict[str, Any] = {
+        field: case(
+            (changes.c[f"set_{field}"], changes.c[field]),
+            else_=col(getattr(Item, field)),
+        )
+        for field in fields
+    }
+    # Rows that set nothing keep their updated_at
+    assignments["updated_at"] = case(
+        (or_(*(changes.c[f"set_{field}"] for field in fields)), func.now()),
+        else_=col(Item.updated_at),
+    )
+    conditions = [col(Item.id) == changes.c.id]
+    if owner_id is not None:
+        conditions.append(col(Item.owner_id) == owner_id)
+    statement = (
+        update(Item)
+        .where(*conditions)
+        .values(assignments)
+        .returning(Item)
+        .execution_options(populate_existing=True)
+    )
+    db_items = {db_item.id: db_item for db_item in session.scalars(statement)}
+    session.commit()
+    return db_items
+
+
+def delete_item_statement(
+    *, item_id: uuid.UUID, owner_id: uuid.UUID | None
+) -> Select[tuple[uuid.UUID]]:
+    """DELETE the item if ``owner_id`` owns it and decrement the owner's counter.
+
+    Both writes are data-modifying CTEs of one statement, which returns the
+    owner of the deleted item or no row if nothing matched.
+    """
+    deleted = (
+        delete(Item)
+        .where(*owned_item_conditions(item_id=item_id, owner_id=owner_id))
+        .returning(col(Item.owner_id))
+        .cte("deleted")
+    )
+    counted = (
+        update(ItemCount)
+        .where(col(ItemCount.owner_id) == deleted.c.owner_id)
+        .values(count=col(ItemCount.count) - 1)
+        .cte("counted")
+    )
+    return select(deleted.c.owner_id).add_cte(counted)
+
+
+def delete_item(
+    *, session: Session, item_id: uuid.UUID, owner_id: uuid.UUID | None
+) -> bool:
+    """Delete the item if ``owner_id`` owns it and commit, in one statement.
+
+    Returns False if no row matched, see ``item_exists``.
+    """
+    statement = delete_item_statement(item_id=item_id, owner_id=owner_id)
+    deleted = session.execute(statement).first() is not None
+    session.commit()
+    return deleted
+
+
+def delete_items(
+    *, session: Session, item_ids: list[uuid.UUID], owner_id: uuid.UUID | None
+) -> set[uuid.UUID]:
+    """DELETE the items ``owner_id`` owns in one statement and commit.
+
+    The ownership check is part of the ``DELETE ... RETURNING`` statement, so
+    no SELECT precedes the write. Returns the deleted ids, ids that matched no
+    row are missing, see ``item_exists``.
+    """
+    conditions: list[ColumnElement[bool]] = [col(Item.id).in_(set(item_ids))]
+    if owner_id is not None:
+        conditions.append(col(Item.owner_id) == owner_id)
+    statement = (
+        delete(Item).where(*conditions).returning(col(Item.id), col(Item.owner_id))
+    )
+    rows = session.execute(statement).all()
+    for item_owner_id, deleted in Counter(row.owner_id for row in rows).items():
+        adjust_item_count(session=session, owner_id=item_owner_id, delta=-deleted)
+    session.commit()
+    return {row.id for row in rows}
+
+
+def create_items(
+    *, session: Session, items_in: list[ItemCreate], owner_id: uuid.UUID
+) -> list[Item]:
+    """Insert a batch of items for one owner in a single transaction.
+
+    The rows go out as a multi-row ``INSERT ... RETURNING``, so the items come
+    back loaded as persisted, in the order of ``items_in``.
+    """
+    rows = [
+        insert_values(Item.model_validate(item_in, update={"owner_id": owner_id}))
+        for item_in in items_in
+    ]
+    statement = insert(Item).returning(Item, sort_by_parameter_order=True)
+    db_items = list(session.scalars(statement, rows))
+    adjust_item_count(session=session, owner_id=owner_id, delta=len(db_items))
+    session.commit()
+    return db_items
+
+
+def copy_items(
+    *, session: Session, items_in: Iterable[ItemCreate], owner_id: uuid.UUID
+) -> int:
+    """Load items for one owner with PostgreSQL COPY and commit.
+
+    ``items_in`` is consumed lazily, so it can be a generator over a large
+    upload. Returns the number of rows loaded.
+    """
+    dbapi_connection: Any = session.connection().connection.driver_connection
+    loaded = 0
+    with dbapi_connection.cursor() as cursor:
+        with cursor.copy(
+            "COPY item (id, owner_id, title, description) FROM STDIN"
+        ) as copy:
+            for item_in in items_in:
+                copy.write_row((uuid7(), owner_id, item_in.title, item_in.description))
+                loaded += 1
+    adjust_item_count(session=session, owner_id=owner_id, delta=loaded)
+    session.commit()
+    return loaded
+
+
+def delete_items_chunk(
+    *, session: Session, owner_id: uuid.UUID, chunk_size: int
+) -> int:
+    """Delete up to ``chunk_size`` items of an owner in the current transaction.
+
+    Returns the number of items deleted, 0 once the owner has none left.
+    """
+    chunk = (
+        select(Item.id)
+        .where(Item.owner_id == owner_id)
+        .order_by(col(Item.id))
+        .limit(chunk_size)
+    )
+    statement = (
+        delete(Item)
+        .where(col(Item.id).in_(chunk.scalar_subquery()))
+        .returning(col(Item.id))
+    )
+    deleted = len(session.execute(statement).scalars().all())
+    if deleted:
+        adjust_item_count(session=session, owner_id=owner_id, delta=-deleted)
+    return deleted
+
+
+def schedule_user_purge(*, session: Session, user_id: uuid.UUID, total: int) -> bool:
+    """Record a pending purge of the user in the current transaction.
+
+    Returns False if a purge of the user is already pending or running.
+    """
+    statement = insert(UserPurge).values(user_id=user_id, total=total)
+    statement = statement.on_conflict_do_update(
+        index_elements=[col(UserPurge.user_id)],
+        set_={
+            "status": "pending",
+            "total": total,
+            "deleted": 0,
+            "updated_at": func.now(),
+        },
+        where=col(UserPurge.status).not_in(["pending", "running"]),
+    )
+    scheduled = session.execute(statement.returning(col(UserPurge.user_id)))
+    return scheduled.first() is not None
+
+
+def claim_user_purge(
+    *, session: Session, user_id: uuid.UUID | None, lease: float
+) -> UserPurge | None:
+    """Mark a purge as running and commit, returning None if none is claimable.
+
+    Pending purges can be claimed, and so can running ones that made no
+    progress for ``lease`` seconds, whose worker presumably died. With
+    ``user_id`` None the longest waiting purge is claimed.
+    """
+    # Compared on the database clock, which also stamped updated_at
+    expired = func.now() - timedelta(seconds=lease)
+    candidate = (
+        select(UserPurge.user_id)
+        .where(
+            or_(
+                col(UserPurge.status) == "pending",
+                and_(
+                    col(UserPurge.status) == "running",
+                    col(UserPurge.updated_at) < expired,
+                ),
+            )
+        )
+        .order_by(col(UserPurge.updated_at))
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if user_id is not None:
+        candidate = candidate.where(col(UserPurge.user_id) == user_id)
+    statement = (
+        update(UserPurge)
+        .where(col(UserPurge.user_id) == candidate.scalar_subquery())
+        .values(status="running", updated_at=func.now())
+        .returning(UserPurge)
+        .execution_options(populate_existing=True)
+    )
+    job = session.scalars(statement).one_or_none()
+    session.commit()
+    return job
+
+
+def update_user_purge(
+    *,
+    session: Session,
+    user_id: uuid.UUID,
+    deleted: int = 0,
+    status: str | None = None,
+) -> None:
+    """Add ``deleted`` to the purge's progress in the current transaction.
+
+    Also refreshes ``updated_at``, which keeps the purge from being reclaimed.
+    """
+    values: dict[str, Any] = {
+        "deleted": col(UserPurge.deleted) + deleted,
+        "updated_at": func.now(),
+    }
+    if status is not None:
+        values["status"] = status
+    session.execute(
+        update(UserPurge).where(col(UserPurge.user_id) == user_id).values(values)
+    )
+
+
+def adjust_item_count_statement(*, owner_id: uuid.UUID, delta: int) -> Insert:
+    """Upsert adding ``delta`` to the owner's item counter."""
+    statement = insert(ItemCount).values(owner_id=owner_id, count=delta)
+    return statement.on_conflict_do_update(
+        index_elements=[col(ItemCount.owner_id)],
+        set_={"count": col(ItemCount.count) + statement.excluded["count"]},
+    )
+
+
+def adjust_item_count(*, session: Session, owner_id: uuid.UUID, delta: int) -> None:
+    """Add ``delta`` to the owner's item counter in the current transaction."""
+    session.execute(adjust_item_count_statement(owner_id=owner_id, delta=delta))
+
+
+def row_estimate_statement(*, model: type[SQLModel]) -> Select[tuple[int]]:
+    """SELECT the planner's row estimate for a table.
+
+    Returns no row if the table has never been vacuumed or analyzed, in which
+    case PostgreSQL has no estimate yet and ``reltuples`` is -1.
+    """
+    pg_class = table(
+        "pg_class",
+        column("oid"),
+        column("relname"),
+        column("relkind"),
+        column("reltuples"),
+    )
+    return select(cast(pg_class.c.reltuples, BigInteger)).where(
+        pg_class.c.relname == str(model.__tablename__),
+        pg_class.c.relkind == "r",
+        func.pg_table_is_visible(pg_class.c.oid),
+        pg_class.c.reltuples >= 0,
+    )
+
+
+def estimate_row_count(*, session: Session, model: type[SQLModel]) -> int | None:
+    """Return the planner's row estimate for a table, None without one."""
+    return session.execute(row_estimate_statement(model=model)).scalar()
+
+
+def count_items_statement(
+    *,
+    owner_id: uuid.UUID | None,
+    strategy: CountStrategy,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+) -> Select[tuple[int]] | None:
+    """SELECT the number of items of ``owner_id``, or of every owner for None.
+
+    The ``estimated`` strategy reads the owner's counter or the planner estimate
+    instead of counting rows; both cover every item, so a time range is always
+    counted. Returns None for the ``none`` strategy.
+    """
+    if strategy == "none":
+        return None
+    time_conditions = item_time_conditions(
+        created_after=created_after, created_before=created_before
+    )
+    exact = select(func.count()).select_from(Item).where(*time_conditions)
+    if owner_id is not None:
+        exact = exact.where(col(Item.owner_id) == owner_id)
+    if strategy != "estimated" or time_conditions:
+        return exact
+    if owner_id is not None:
+        counter = select(ItemCount.count).where(col(ItemCount.owner_id) == owner_id)
+        return select(func.coalesce(counter.scalar_subquery(), 0))
+    # The rows are only counted while the table has no estimate, COALESCE
+    # does not evaluate the subquery otherwise
+    return select(
+        func.coalesce(
+            row_estimate_statement(model=Item).scalar_subquery(),
+            exact.scalar_subquery(),
+        )
+    )
+
+
+def count_items(
+    *,
+    session: Session,
+    owner_id: uuid.UUID | None,
+    strategy: CountStrategy,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+) -> int | None:
+    statement = count_items_statement(
+        owner_id=owner_id,
+        strategy=strategy,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    if statement is None:
+        return None
+    return session.scalars(statement).one()
+
+
+def count_users(*, session: Session, strategy: CountStrategy) -> int | None:
+    if strategy == "none":
+        return None
+    if strategy == "estimated":
+        estimate = estimate_row_count(session=session, model=User)
+        if estimate is not None:
+            return estimate
+    return session.exec(select(func.count()).select_from(User)).one()
+
+
+def add_outbox_email(
+    *, session: Session, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    """Stage an email in the session, it is queued once the session commits."""
+    db_email = EmailOutbox(
+        email_to=email_to, subject=subject, html_content=html_content
+    )
+    session.add(db_email)
+    return db_email
+
+
+def delete_outbox_emails(*, session: Session, older_than: timedelta, limit: int) -> int:
+    """Delete up to ``limit`` sent or failed emails and commit.
+
+    Only emails queued more than ``older_than`` ago are deleted. Returns the
+    number of emails deleted.
+    """
+    expired = (
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status != "pending")
+        .where(EmailOutbox.created_at < func.now() - older_than)
+        .limit(limit)
+    )
+    statement = (
+        delete(EmailOutbox)
+        .where(col(EmailOutbox.id).in_(expired.scalar_subquery()))
+        .returning(col(EmailOutbox.id))
+    )
+    deleted = len(session.execute(statement).scalars().all())
+    session.commit()
+    return deleted
+
+
+def claim_outbox_emails(*, session: Session, limit: int) -> list[EmailOutbox]:
+    """Lock up to ``limit`` due emails for the rest of the transaction.
+
+    Rows locked by another worker are skipped rather than waited on.
+    """
+    statement = (
+        select(EmailOutbox)
+        .where(EmailOutbox.status == "pending")
+        .where(EmailOutbox.next_attempt_at <= func.now())
+        .order_by(col(EmailOutbox.next_attempt_at))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(session.exec(statement).all())
@@ -0,0 +1,110 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.password_hasher import password_hasher
+from app.crud import (
+    adjust_item_count_statement,
+    count_items_statement,
+    delete_item_statement,
+    insert_values,
+    owned_item_conditions,
+)
+from app.models import CountStrategy, Item, ItemCreate, ItemUpdate, User
+
+
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    session_user = (await session.exec(statement)).first()
+    return session_user
+
+
+async def authenticate(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email(session=session, email=email)
+    if not db_user:
+        return None
+    if not await password_hasher.verify_async(password, db_user.hashed_password):
+        return None
+    return db_user
+
+
+async def create_item(
+    *, session: AsyncSession, item_in: ItemCreate, owner_id: uuid.UUID
+) -> Item:
+    db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
+    statement = insert(Item).values(insert_values(db_item)).returning(Item)
+    db_item = (await session.scalars(statement)).one()
+    await adjust_item_count(session=session, owner_id=owner_id, delta=1)
+    await session.commit()
+    return db_item
+
+
+async def item_exists(*, session: AsyncSession, item_id: uuid.UUID) -> bool:
+    statement = select(Item.id).where(col(Item.id) == item_id)
+    return (await session.exec(statement)).first() is not None
+
+
+async def update_item(
+    *,
+    session: AsyncSession,
+    item_id: uuid.UUID,
+    owner_id: uuid.UUID | None,
+    item_in: ItemUpdate,
+) -> Item | None:
+    """UPDATE the item if ``owner_id`` owns it and commit, None if no row matched."""
+    conditions = owned_item_conditions(item_id=item_id, owner_id=owner_id)
+    values = item_in.model_dump(exclude_unset=True)
+    if not values:
+        return (await session.exec(select(Item).where(*conditions))).first()
+    statement = (
+        update(Item)
+        .where(*conditions)
+        .values(values)
+        .returning(Item)
+        .execution_options(populate_existing=True)
+    )
+    db_item = (await session.scalars(statement)).one_or_none()
+    await session.commit()
+    return db_item
+
+
+async def delete_item(
+    *, session: AsyncSession, item_id: uuid.UUID, owner_id: uuid.UUID | None
+) -> bool:
+    """Delete the item if ``owner_id`` owns it and commit, in one statement."""
+    statement = delete_item_statement(item_id=item_id, owner_id=owner_id)
+    deleted = (await session.execute(statement)).first() is not None
+    await session.commit()
+    return deleted
+
+
+async def adjust_item_count(
+    *, session: AsyncSession, owner_id: uuid.UUID, delta: int
+) -> None:
+    """Add ``delta`` to the owner's item counter in the current transaction."""
+    await session.execute(adjust_item_count_statement(owner_id=owner_id, delta=delta))
+
+
+async def count_items(
+    *,
+    session: AsyncSession,
+    owner_id: uuid.UUID | None,
+    strategy: CountStrategy,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+) -> int | None:
+    statement = count_items_statement(
+        owner_id=owner_id,
+        strategy=strategy,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    if statement is None:
+        return None
+    return (await session.scalars(statement)).one()
@@ -16,13 +16,28 @@ except ImportError:
     print("Warning: sentry_sdk not found, Sentry integration will be disabled")
     SENTRY_AVAILABLE = False
 
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.api.middlewares.consistency import ConsistencyTokenMiddleware
+from app.api.middlewares.metrics import MetricsMiddleware
 from app.api.middlewares.posthog import PostHogMiddleware
+from app.api.middlewares.query_stats import QueryStatsMiddleware
 from app.core.config import settings
+from app.core.db_factory import engines
+from app.core.metrics import mark_process_dead
+from app.core.password_hasher import PasswordHasherBusyError, password_hasher
+from app.core.replica import CONSISTENCY_TOKEN_HEADER
+from app.utils.analytics_spool import analytics_spool
+from app.utils.email_templates import email_templates
+from app.utils.posthog_pipeline import posthog_pipeline
+from app.utils.posthog_tracker import send_batch
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -38,12 +53,44 @@ if POSTHOG_AVAILABLE and settings.posthog_enabled:
     posthog.api_key = settings.POSTHOG_API_KEY
     posthog.host = settings.POSTHOG_HOST
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    email_templates.precompile()
+    if POSTHOG_AVAILABLE and settings.posthog_enabled:
+        analytics_spool.start(
+            send_batch,
+            interval=settings.POSTHOG_SPOOL_DRAIN_INTERVAL_SECONDS,
+            max_backoff=settings.POSTHOG_SPOOL_MAX_BACKOFF_SECONDS,
+        )
+        posthog_pipeline.start()
+    yield
+    posthog_pipeline.stop()
+    analytics_spool.stop()
+    password_hasher.shutdown()
+    await engines.dispose()
+    mark_process_dead()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(
+    _request: Request, _exc: PasswordHasherBusyError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many password requests, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Set all CORS enabled origins
 if settings.all_cors_origins:
     app.add_middleware(
@@ -52,8 +99,15 @@ if settings.all_cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[CONSISTENCY_TOKEN_HEADER, "Server-Timing"],
     )
 
+# Hand out read-your-writes tokens when reads are routed to a replica
+if settings.DATABASE_REPLICA_URL:
+    app.add_middleware(ConsistencyTokenMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 # Add PostHog middleware
 if POSTHOG_AVAILABLE and settings.posthog_enabled:
     app.add_middleware(PostHogMiddleware)
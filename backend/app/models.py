@@ -1,9 +1,13 @@
 import uuid
+from datetime import datetime
+from typing import Literal
 
 from pydantic import EmailStr
-from sqlalchemy import String
+from sqlalchemy import BigInteger, DateTime, Index, String, Text, func, text
 from sqlmodel import Column, Field, Relationship, SQLModel
 
+from app.core.uuid7 import uuid7
+
 
 # Shared properties
 class UserBase(SQLModel):
@@ -46,12 +50,19 @@ class UpdatePassword(SQLModel):
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: uuid.UUID = Field(
+        default_factory=uuid7,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("uuid_generate_v7()")},
+    )
     hashed_password: str
     items: list["Item"] = Relationship(
         back_populates="owner",
         sa_relationship_kwargs={
             "cascade": "all, delete-orphan",
+            # Let the item_owner_id_fkey ON DELETE CASCADE remove items instead
+            # of loading them into the session first
+            "passive_deletes": True,
             "primaryjoin": "User.id == Item.owner_id",
             "foreign_keys": "[Item.owner_id]",
         },
@@ -65,7 +76,8 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -86,9 +98,29 @@ class ItemUpdate(ItemBase):
 
 # Database model, database table inferred from class name
 class Item(ItemBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    # Remove foreign_key constraint, but keep it indexed for performance
-    owner_id: uuid.UUID = Field(index=True, nullable=False)
+    __table_args__ = (
+        # (owner_id, id) backs both owner lookups and keyset pagination
+        Index("ix_item_owner_id_id", "owner_id", "id"),
+        # Newest first listings of one owner, id breaks ties for the cursor
+        Index(
+            "ix_item_owner_id_created_at",
+            "owner_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        # Newest first listings across owners, for superusers
+        Index("ix_item_created_at_id", text("created_at DESC"), text("id DESC")),
+        # Time range scans across owners, rows are appended in created_at order
+        Index("ix_item_created_at_brin", "created_at", postgresql_using="brin"),
+    )
+
+    id: uuid.UUID = Field(
+        default_factory=uuid7,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("uuid_generate_v7()")},
+    )
+    # No foreign_key constraint; lookups by owner use ix_item_owner_id_id
+    owner_id: uuid.UUID = Field(nullable=False)
     owner: User | None = Relationship(
         back_populates="items",
         sa_relationship_kwargs={
@@ -96,17 +128,169 @@ class Item(ItemBase, table=True):
             "foreign_keys": "[Item.owner_id]",
         },
     )
+    # Stamped by the database clock, None until the row is inserted
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+    updated_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.now(),
+            onupdate=func.now(),
+        ),
+    )
+
+
+# Per-owner item counter, maintained in the same transaction as item inserts
+# and deletes so owner-scoped listings can skip COUNT(*)
+class ItemCount(SQLModel, table=True):
+    owner_id: uuid.UUID = Field(primary_key=True)
+    count: int = Field(default=0, sa_type=BigInteger)
+
+
+# How list endpoints compute the total count:
+# exact runs COUNT(*), estimated uses the per-owner counter or the planner's
+# row estimate, and none skips counting
+CountStrategy = Literal["exact", "estimated", "none"]
+
+# Item list orders: owner_id is (owner_id, id), -created_at is newest first
+ItemSort = Literal["owner_id", "-created_at"]
 
 
 # Properties to return via API, id is always required
 class ItemPublic(ItemBase):
     id: uuid.UUID
     owner_id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
 
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+# Maximum number of rows accepted by a single bulk item request
+ITEMS_BULK_MAX_SIZE = 1000
+
+
+# Properties to receive on bulk item creation
+class ItemsBulkCreate(SQLModel):
+    data: list[ItemCreate] = Field(min_length=1, max_length=ITEMS_BULK_MAX_SIZE)
+
+
+# Properties to receive on bulk item update, id selects the item to change
+class ItemBulkUpdate(ItemUpdate):
+    id: uuid.UUID
+
+
+class ItemsBulkUpdate(SQLModel):
+    data: list[ItemBulkUpdate] = Field(min_length=1, max_length=ITEMS_BULK_MAX_SIZE)
+
+
+class ItemsBulkDelete(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=ITEMS_BULK_MAX_SIZE)
+
+
+# Outcome of one row of a bulk request, status_code mirrors the status the
+# single-item route would have returned
+class ItemBulkResult(SQLModel):
+    index: int
+    id: uuid.UUID | None = None
+    status_code: int
+    detail: str | None = None
+    item: ItemPublic | None = None
+
+
+class ItemsBulkResult(SQLModel):
+    data: list[ItemBulkResult]
+
+
+# Summary of a streamed item import, rejected rows are listed in the errors file
+class ItemsImportResult(SQLModel):
+    import_id: uuid.UUID
+    imported: int
+    failed: int
+
+
+# Progress of a background user purge
+class UserPurgePublic(SQLModel):
+    user_id: uuid.UUID
+    status: str
+    total: int
+    deleted: int
+
+
+# Background purge of a user with many items. Its progress is committed with
+# every chunk of deleted items, so updated_at doubles as a heartbeat.
+class UserPurge(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_userpurge_updated_at_active",
+            "updated_at",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+    user_id: uuid.UUID = Field(primary_key=True)
+    # pending until claimed, then running until done or failed
+    status: str = Field(default="pending", max_length=16)
+    total: int
+    deleted: int = 0
+    created_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+    updated_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+
+
+# Emails waiting for the outbox worker, inserted in the same transaction as the
+# change that triggers them
+class EmailOutbox(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_emailoutbox_next_attempt_at_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str = Field(max_length=998)
+    html_content: str = Field(sa_type=Text)
+    # pending until delivered, failed once the worker gives up retrying
+    status: str = Field(default="pending", max_length=16)
+    attempts: int = 0
+    last_error: str | None = Field(default=None, sa_type=Text)
+    # Stamped by the database clock the worker queries compare them with, None
+    # until the row is inserted
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+    next_attempt_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
+    sent_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
 
 
 # Generic message
@@ -0,0 +1,110 @@
+from collections.abc import AsyncGenerator, Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.api.deps import get_async_db
+from app.api.routes import async_items, async_login, items
+from app.core.config import settings
+from app.core.db_factory import get_db_url
+from app.models import UserCreate
+from app.tests.utils.item import create_random_item
+from app.tests.utils.user import user_authentication_headers
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture(scope="module")
+def async_client() -> Generator[TestClient, None, None]:
+    # Each TestClient runs its own event loop, so connections are not pooled
+    # across tests
+    engine = create_async_engine(get_db_url(), poolclass=NullPool)
+
+    async def get_test_async_db() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(async_login.router, prefix=settings.API_V1_STR)
+    app.include_router(async_items.router, prefix=settings.API_V1_STR)
+    app.include_router(items.router, prefix=settings.API_V1_STR)
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="module")
+def async_user_headers(async_client: TestClient, db: Session) -> dict[str, str]:
+    email = random_email()
+    password = random_lower_string()
+    crud.create_user(session=db, user_create=UserCreate(email=email, password=password))
+    return user_authentication_headers(
+        client=async_client, email=email, password=password
+    )
+
+
+def test_async_item_lifecycle(
+    async_client: TestClient, async_user_headers: dict[str, str]
+) -> None:
+    r = async_client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=async_user_headers,
+        json={"title": "Async", "description": "Created async"},
+    )
+    assert r.status_code == 200
+    item_id = r.json()["id"]
+
+    r = async_client.put(
+        f"{settings.API_V1_STR}/items/{item_id}",
+        headers=async_user_headers,
+        json={"title": "Async updated"},
+    )
+    assert r.status_code == 200
+    assert r.json()["title"] == "Async updated"
+
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=async_user_headers,
+        params={"count": "estimated"},
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] == 1
+    assert [item["id"] for item in r.json()["data"]] == [item_id]
+
+    r = async_client.delete(
+        f"{settings.API_V1_STR}/items/{item_id}", headers=async_user_headers
+    )
+    assert r.status_code == 200
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/{item_id}", headers=async_user_headers
+    )
+    assert r.status_code == 404
+
+
+def test_async_read_item_not_enough_permissions(
+    async_client: TestClient, async_user_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/{item.id}", headers=async_user_headers
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Not enough permissions"
+
+
+def test_async_router_falls_through_to_sync_routes(
+    async_client: TestClient, async_user_headers: dict[str, str]
+) -> None:
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/export", headers=async_user_headers
+    )
+    assert r.status_code == 200
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/not-a-uuid", headers=async_user_headers
+    )
+    assert r.status_code == 422
@@ -1,9 +1,23 @@
+import csv
+import io
+import json
+import os
+import random
 import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app.api.middlewares import ConsistencyTokenMiddleware
+from app.api.routes.items import _import_errors_path
 from app.core.config import settings
+from app.core.db_factory import get_db_url
+from app.core.db_instrumentation import route_query_stats
+from app.core.replica import CONSISTENCY_TOKEN_HEADER
+from app.main import app
+from app.models import ItemPublic, ItemsPublic
 from app.tests.utils.item import create_random_item
 
 
@@ -79,6 +93,22 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+def test_read_items_matches_public_model(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"limit": 1000},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    page = ItemsPublic.model_validate_json(response.content)
+    assert page.model_dump(mode="json") == response.json()
+    assert ItemPublic.model_validate(item) in page.data
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -162,3 +192,519 @@ def test_delete_item_not_enough_permissions(
     assert response.status_code == 400
     content = response.json()
     assert content["detail"] == "Not enough permissions"
+
+
+def test_read_items_cursor_pagination(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    for i in range(3):
+        r = client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"title": f"Page item {i}"},
+        )
+        assert r.status_code == 200
+
+    r = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"limit": 1000},
+    )
+    expected = [item["id"] for item in r.json()["data"]]
+    assert len(expected) >= 3
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        r = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            params=params,
+        )
+        assert r.status_code == 200
+        content = r.json()
+        assert len(content["data"]) <= 2
+        seen.extend(item["id"] for item in content["data"])
+        if content["next_cursor"] is None:
+            break
+        params = {"limit": 2, "cursor": content["next_cursor"]}
+    assert seen == expected
+
+
+def test_read_items_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_read_items_count_strategies(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Counted item"},
+    )
+    item_id = r.json()["id"]
+
+    def get_count(strategy: str) -> int | None:
+        r = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            params={"count": strategy},
+        )
+        assert r.status_code == 200
+        count: int | None = r.json()["count"]
+        return count
+
+    exact = get_count("exact")
+    assert exact is not None and exact >= 1
+    assert get_count("estimated") == exact
+    assert get_count("none") is None
+
+    client.delete(
+        f"{settings.API_V1_STR}/items/{item_id}", headers=normal_user_token_headers
+    )
+    assert get_count("estimated") == exact - 1
+    assert get_count("exact") == exact - 1
+
+
+def test_read_items_by_created_at(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    # Items backdated into a few seconds of 2001-2004 picked at random, so rows
+    # left over from earlier runs do not fall into the range
+    base = datetime(2001, 1, 1, tzinfo=timezone.utc)
+    base += timedelta(seconds=random.randrange(10**8))
+    items = [create_random_item(db) for _ in range(3)]
+    for offset, item in enumerate(items, start=1):
+        item.created_at = base + timedelta(seconds=offset)
+        db.add(item)
+    db.commit()
+    ids = [str(item.id) for item in items]
+
+    params: dict[str, str | int] = {
+        "sort": "-created_at",
+        "created_after": base.isoformat(),
+        "created_before": (base + timedelta(seconds=4)).isoformat(),
+        "count": "estimated",
+        "limit": 2,
+    }
+    r = client.get(
+        f"{settings.API_V1_STR}/items/", headers=superuser_token_headers, params=params
+    )
+    assert r.status_code == 200
+    content = r.json()
+    # The estimate cannot cover a time range, so it falls back to counting
+    assert content["count"] == 3
+    assert [item["id"] for item in content["data"]] == [ids[2], ids[1]]
+    created_at = datetime.fromisoformat(content["data"][0]["created_at"])
+    assert created_at == base + timedelta(seconds=3)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={**params, "cursor": content["next_cursor"]},
+    )
+    content = r.json()
+    assert [item["id"] for item in content["data"]] == [ids[0]]
+    assert content["next_cursor"] is None
+
+    r = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={**params, "created_after": (base + timedelta(seconds=1)).isoformat()},
+    )
+    assert [item["id"] for item in r.json()["data"]] == [ids[2], ids[1]]
+
+
+def test_update_item_sets_updated_at(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    r = client.put(
+        f"{settings.API_V1_STR}/items/{item.id}",
+        headers=superuser_token_headers,
+        json={"title": "Touched"},
+    )
+    assert r.status_code == 200
+    created_at = datetime.fromisoformat(r.json()["created_at"])
+    updated_at = datetime.fromisoformat(r.json()["updated_at"])
+    assert created_at == item.created_at
+    assert updated_at > created_at
+
+
+def test_read_items_estimated_count_superuser(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"count": "estimated"},
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] >= 0
+
+
+def test_bulk_create_items(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    data = {
+        "data": [{"title": f"Bulk {i}", "description": "Imported"} for i in range(3)]
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert all(result["status_code"] == 200 for result in results)
+    assert [result["item"]["title"] for result in results] == [
+        "Bulk 0",
+        "Bulk 1",
+        "Bulk 2",
+    ]
+    for result in results:
+        r = client.get(
+            f"{settings.API_V1_STR}/items/{result['id']}",
+            headers=normal_user_token_headers,
+        )
+        assert r.status_code == 200
+
+
+def test_bulk_create_items_rejects_invalid_rows(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": [{"title": "Valid"}, {"title": ""}]},
+    )
+    assert response.status_code == 422
+
+
+def test_bulk_update_items(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Mine", "description": "Before"},
+    )
+    own_item_id = r.json()["id"]
+    other_item = create_random_item(db)
+    missing_id = str(uuid.uuid4())
+
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={
+            "data": [
+                {"id": own_item_id, "title": "Mine, updated"},
+                {"id": str(other_item.id), "title": "Not mine"},
+                {"id": missing_id, "title": "Missing"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert results[0]["status_code"] == 200
+    assert results[0]["item"]["title"] == "Mine, updated"
+    assert results[0]["item"]["description"] == "Before"
+    assert results[1]["status_code"] == 400
+    assert results[1]["detail"] == "Not enough permissions"
+    assert results[2]["status_code"] == 404
+    assert results[2]["detail"] == "Item not found"
+
+    db.refresh(other_item)
+    assert other_item.title != "Not mine"
+
+
+def test_bulk_update_items_merges_rows_for_one_id(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Mine", "description": "Before"},
+    )
+    item = r.json()
+
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={
+            "data": [
+                {"id": item["id"], "title": "First"},
+                {"id": item["id"], "description": None},
+                {"id": item["id"]},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [result["status_code"] for result in results] == [200, 200, 200]
+    for result in results:
+        assert result["item"]["title"] == "First"
+        assert result["item"]["description"] is None
+        assert result["item"]["created_at"] == item["created_at"]
+
+
+def test_bulk_delete_items(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "To delete"},
+    )
+    own_item_id = r.json()["id"]
+    other_item = create_random_item(db)
+
+    response = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"ids": [own_item_id, str(other_item.id), str(uuid.uuid4())]},
+    )
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [result["status_code"] for result in results] == [200, 400, 404]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/items/{own_item_id}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 404
+
+
+def test_export_items_ndjson(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": [{"title": f"Export {i}"} for i in range(3)]},
+    )
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers)
+    expected = sorted(item["id"] for item in r.json()["data"])
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-encoding"] == "gzip"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == expected
+    assert {"id", "owner_id", "title", "description"} == set(rows[0])
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=normal_user_token_headers,
+        params={"after": expected[0]},
+    )
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == expected[1:]
+
+
+def test_export_items_csv(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers={**normal_user_token_headers, "Accept-Encoding": "identity"},
+        params={"format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "content-encoding" not in response.headers
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "owner_id", "title", "description"]
+    assert len(rows) > 1
+
+
+def test_import_items_ndjson(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    lines = [
+        json.dumps({"title": "Imported 1", "description": "First"}),
+        json.dumps({"title": ""}),
+        "",
+        json.dumps({"title": "Imported 2"}),
+        "{not json",
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/items/import",
+        headers=normal_user_token_headers,
+        files={"file": ("items.ndjson", "\n".join(lines), "application/x-ndjson")},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["imported"] == 2
+    assert content["failed"] == 2
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/import/{content['import_id']}/errors",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    errors = [json.loads(line) for line in response.text.splitlines()]
+    assert [error["line"] for error in errors] == [2, 5]
+
+
+def test_import_items_csv(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    body = "title,description\r\nCSV item,From CSV\r\n,Missing title\r\n"
+    response = client.post(
+        f"{settings.API_V1_STR}/items/import",
+        headers=normal_user_token_headers,
+        params={"format": "csv"},
+        files={"file": ("items.csv", body, "text/csv")},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["imported"] == 1
+    assert content["failed"] == 1
+
+    r = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"limit": 1000},
+    )
+    assert "CSV item" in [item["title"] for item in r.json()["data"]]
+
+
+def test_import_items_with_invalid_utf8(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    bodies = {
+        "ndjson": b'{"title": "Valid 1"}\n{"title": "Bad \xff"}\n{"title": "Valid 2"}\n',
+        "csv": b"title,description\r\nValid 1,\r\nBad \xff,\r\nValid 2,\r\n",
+    }
+    for import_format, body in bodies.items():
+        response = client.post(
+            f"{settings.API_V1_STR}/items/import",
+            headers=normal_user_token_headers,
+            params={"format": import_format},
+            files={"file": (f"items.{import_format}", body)},
+        )
+        assert response.status_code == 200
+        content = response.json()
+        assert content["imported"] == 2
+        assert content["failed"] == 1
+
+        response = client.get(
+            f"{settings.API_V1_STR}/items/import/{content['import_id']}/errors",
+            headers=normal_user_token_headers,
+        )
+        errors = [json.loads(line) for line in response.text.splitlines()]
+        line = 2 if import_format == "ndjson" else 3
+        assert errors == [
+            {
+                "line": line,
+                "errors": [
+                    {"type": "unicode_invalid", "msg": "Row is not valid UTF-8"}
+                ],
+            }
+        ]
+
+
+def test_import_errors_not_found(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/import/{uuid.uuid4()}/errors",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 404
+
+
+def test_expired_import_errors_are_deleted(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/import",
+        headers=normal_user_token_headers,
+        files={"file": ("items.ndjson", b'{"title": ""}\n')},
+    )
+    import_id = response.json()["import_id"]
+    url = f"{settings.API_V1_STR}/items/import/{import_id}/errors"
+    assert client.get(url, headers=normal_user_token_headers).status_code == 200
+
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    path = _import_errors_path(uuid.UUID(r.json()["id"]), uuid.UUID(import_id))
+    expired = path.stat().st_mtime - settings.ITEMS_IMPORT_ERRORS_RETENTION_SECONDS
+    os.utime(path, (expired - 1, expired - 1))
+    assert client.get(url, headers=normal_user_token_headers).status_code == 404
+
+    client.post(
+        f"{settings.API_V1_STR}/items/import",
+        headers=normal_user_token_headers,
+        files={"file": ("items.ndjson", b"")},
+    )
+    assert not path.exists()
+
+
+def test_writes_return_consistency_token_for_replica_reads(
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    # The middleware is only installed when a replica is configured at startup
+    client = TestClient(ConsistencyTokenMiddleware(app))
+    with patch.object(settings, "DATABASE_REPLICA_URL", get_db_url()):
+        response = client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"title": "Replicated"},
+        )
+        assert response.status_code == 200
+        token = response.headers[CONSISTENCY_TOKEN_HEADER]
+
+        response = client.get(
+            f"{settings.API_V1_STR}/items/{response.json()['id']}",
+            headers={**normal_user_token_headers, CONSISTENCY_TOKEN_HEADER: token},
+        )
+        assert response.status_code == 200
+        assert CONSISTENCY_TOKEN_HEADER not in response.headers
+
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers={**normal_user_token_headers, CONSISTENCY_TOKEN_HEADER: "x"},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid consistency token"
+
+
+def test_no_consistency_token_without_replica(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Not replicated"},
+    )
+    assert response.status_code == 200
+    assert CONSISTENCY_TOKEN_HEADER not in response.headers
+
+
+def test_read_items_reports_server_timing(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;desc=")
+    totals = route_query_stats.snapshot()[f"GET {settings.API_V1_STR}/items/"]
+    assert totals.requests >= 1
+    assert totals.queries >= 1
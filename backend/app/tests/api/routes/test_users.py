@@ -1,4 +1,6 @@
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
@@ -6,8 +8,11 @@ from sqlmodel import Session, select
 
 from app import crud
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
 from app.core.security import verify_password
-from app.models import User, UserCreate
+from app.core.user_purge import user_purger
+from app.models import EmailOutbox, Item, ItemCreate, User, UserCreate
+from app.tests.utils.user import user_authentication_headers
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -33,13 +38,24 @@ def test_get_users_normal_user_me(
     assert current_user["email"] == settings.EMAIL_TEST_USER
 
 
+def test_read_user_me_does_not_cache_replica_principal(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    user_id = uuid.UUID(r.json()["id"])
+    principal_cache.invalidate(user_id)
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert principal_cache.get(user_id) is None
+
+
 def test_create_user_new_email(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     with (
-        patch("app.utils.send_email", return_value=None),
         patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
         patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
     ):
         username = random_email()
         password = random_lower_string()
@@ -54,6 +70,14 @@ def test_create_user_new_email(
         user = crud.get_user_by_email(session=db, email=username)
         assert user
         assert user.email == created_user["email"]
+        # The email is only queued, and links to the password form instead of
+        # holding it
+        email = db.exec(
+            select(EmailOutbox).where(EmailOutbox.email_to == username)
+        ).one()
+        assert (email.status, email.attempts) == ("pending", 0)
+        assert password not in email.html_content
+        assert "/reset-password?token=" in email.html_content
 
 
 def test_get_existing_user(
@@ -168,6 +192,32 @@ def test_retrieve_users(
         assert "email" in item
 
 
+def test_retrieve_users_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(2):
+        user_in = UserCreate(email=random_email(), password=random_lower_string())
+        crud.create_user(session=db, user_create=user_in)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"limit": 1},
+    )
+    first_page = r.json()
+    assert len(first_page["data"]) == 1
+    assert first_page["next_cursor"]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"limit": 1, "cursor": first_page["next_cursor"]},
+    )
+    second_page = r.json()
+    assert len(second_page["data"]) == 1
+    assert second_page["data"][0]["id"] > first_page["data"][0]["id"]
+
+
 def test_update_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -320,6 +370,24 @@ def test_register_user_already_exists_error(client: TestClient) -> None:
     assert r.json()["detail"] == "The user with this email already exists in the system"
 
 
+def test_register_user_concurrent_same_email(client: TestClient) -> None:
+    email = random_email()
+    signups = 16
+    start = threading.Barrier(signups)
+
+    def sign_up(_: int) -> int:
+        data = {"email": email, "password": random_lower_string()}
+        start.wait()
+        r = client.post(f"{settings.API_V1_STR}/users/signup", json=data)
+        return r.status_code
+
+    with ThreadPoolExecutor(max_workers=signups) as executor:
+        status_codes = sorted(executor.map(sign_up, range(signups)))
+
+    # The email conflict resolves in the INSERT, never as an IntegrityError
+    assert status_codes == [200] + [400] * (signups - 1)
+
+
 def test_update_user(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -346,6 +414,32 @@ def test_update_user(
     assert user_db.full_name == "Updated_full_name"
 
 
+def test_update_user_deactivation_invalidates_cached_principal(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    username = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=username, password=password)
+    user = crud.create_user(session=db, user_create=user_in)
+    headers = user_authentication_headers(
+        client=client, email=username, password=password
+    )
+
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+    assert r.status_code == 200
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert r.status_code == 200
+
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
+
+
 def test_update_user_not_exists(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -444,6 +538,53 @@ def test_delete_user_super_user(
     assert result is None
 
 
+def test_delete_user_with_many_items_is_purged(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+    user = crud.create_user(session=db, user_create=user_in)
+    user_id = user.id
+    items_in = [ItemCreate(title=f"Purged {i}") for i in range(5)]
+    crud.create_items(session=db, items_in=items_in, owner_id=user_id)
+
+    with (
+        patch.object(settings, "USER_PURGE_SYNC_THRESHOLD", 2),
+        patch.object(user_purger, "chunk_size", 2),
+    ):
+        r = client.delete(
+            f"{settings.API_V1_STR}/users/{user_id}",
+            headers=superuser_token_headers,
+        )
+    assert r.status_code == 202
+    assert r.json()["message"] == "User deletion scheduled"
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/{user_id}/purge",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json() == {
+        "user_id": str(user_id),
+        "status": "done",
+        "total": 5,
+        "deleted": 5,
+    }
+    db.expire_all()
+    assert db.get(User, user_id) is None
+    assert not db.exec(select(Item).where(Item.owner_id == user_id)).first()
+
+
+def test_read_user_purge_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/{uuid.uuid4()}/purge",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Purge not found"
+
+
 def test_delete_user_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
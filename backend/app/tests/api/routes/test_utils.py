@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_metrics_disabled_without_token(client: TestClient) -> None:
+    with patch.object(settings, "METRICS_TOKEN", None):
+        r = client.get(f"{settings.API_V1_STR}/utils/metrics/")
+    assert r.status_code == 404
+
+
+def test_metrics_rejects_wrong_token(client: TestClient) -> None:
+    with patch.object(settings, "METRICS_TOKEN", "scrape-secret"):
+        r = client.get(
+            f"{settings.API_V1_STR}/utils/metrics/",
+            headers={"Authorization": "Bearer wrong"},
+        )
+    assert r.status_code == 403
+
+
+def test_metrics_exposes_route_and_pool_metrics(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    client.get(f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers)
+    with patch.object(settings, "METRICS_TOKEN", "scrape-secret"):
+        r = client.get(
+            f"{settings.API_V1_STR}/utils/metrics/",
+            headers={"Authorization": "Bearer scrape-secret"},
+        )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="items-read_items",status="200"}'
+        in body
+    )
+    assert "http_requests_in_progress" in body
+    assert "threadpool_threads_total" in body
+    assert 'db_pool_connections_checked_out{engine="primary"}' in body
+    assert 'db_pool_checkout_wait_seconds_count{engine="primary"}' in body
+    assert 'password_hasher_operations_total{operation="verify"}' in body
@@ -0,0 +1,123 @@
+import re
+import uuid
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import ItemCount
+from app.tests.utils.utils import random_email, random_lower_string
+
+_QUERIES_PATTERN = re.compile(r'db;desc="(\d+) queries"')
+
+
+def statement_count(response: httpx.Response) -> int:
+    match = _QUERIES_PATTERN.search(response.headers["Server-Timing"])
+    assert match, response.headers["Server-Timing"]
+    return int(match.group(1))
+
+
+def test_item_writes_skip_refresh(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    # Warm the principal cache so authentication does not query
+    client.get(f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers)
+
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Counted"},
+    )
+    assert r.status_code == 200
+    # INSERT ... RETURNING and the item counter upsert
+    assert statement_count(r) == 2
+
+    r = client.put(
+        f"{settings.API_V1_STR}/items/{r.json()['id']}",
+        headers=normal_user_token_headers,
+        json={"title": "Counted again"},
+    )
+    assert r.status_code == 200
+    assert r.json()["title"] == "Counted again"
+    # UPDATE ... WHERE owner RETURNING, without a lookup first
+    assert statement_count(r) == 1
+
+
+def test_item_delete_is_one_statement(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Deleted"},
+    )
+    item_id, owner_id = r.json()["id"], r.json()["owner_id"]
+    count = db.get(ItemCount, uuid.UUID(owner_id))
+    assert count
+    before = count.count
+
+    r = client.delete(
+        f"{settings.API_V1_STR}/items/{item_id}", headers=normal_user_token_headers
+    )
+    assert r.status_code == 200
+    # The DELETE and the counter decrement share one statement
+    assert statement_count(r) == 1
+    db.refresh(count)
+    assert count.count == before - 1
+
+
+def test_item_write_misses_probe_once(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    client.get(f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers)
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        json={"title": "Not yours"},
+    )
+    url = f"{settings.API_V1_STR}/items/{r.json()['id']}"
+
+    r = client.put(url, headers=normal_user_token_headers, json={"title": "Mine"})
+    assert r.status_code == 400
+    # The conditional UPDATE and the probe telling forbidden from missing
+    assert statement_count(r) == 2
+
+    r = client.delete(url, headers=normal_user_token_headers)
+    assert r.status_code == 400
+    assert statement_count(r) == 2
+
+    r = client.delete(
+        f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 404
+    assert statement_count(r) == 2
+
+
+def test_user_writes_skip_refresh(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    email = random_email()
+    r = client.post(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        json={"email": email, "password": random_lower_string()},
+    )
+    assert r.status_code == 200
+    # Current user and INSERT ... ON CONFLICT DO NOTHING RETURNING
+    assert statement_count(r) == 2
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/me",
+        headers=normal_user_token_headers,
+        json={"full_name": "Counted"},
+    )
+    assert r.status_code == 200
+    assert r.json()["full_name"] == "Counted"
+    # Current user and UPDATE ... RETURNING
+    assert statement_count(r) == 2
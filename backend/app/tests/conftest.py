@@ -1,26 +1,36 @@
 from collections.abc import Generator
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
 from app.core.config import settings
-from app.core.db import engine, init_db
+from app.core.db import init_db
+from app.core.db_factory import get_engine
 from app.main import app
-from app.models import Item, User
+from app.models import EmailOutbox, Item, ItemCount, User, UserPurge
+from app.tests.utils.smtp_sink import SMTPSink
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
+from app.utils.smtp_transport import smtp_transport
 
 
 @pytest.fixture(scope="session", autouse=True)
 def db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         init_db(session)
         yield session
         statement = delete(Item)
         session.execute(statement)
+        statement = delete(ItemCount)
+        session.execute(statement)
         statement = delete(User)
         session.execute(statement)
+        statement = delete(EmailOutbox)
+        session.execute(statement)
+        statement = delete(UserPurge)
+        session.execute(statement)
         session.commit()
 
 
@@ -40,3 +50,18 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture
+def smtp_sink() -> Generator[SMTPSink, None, None]:
+    with (
+        SMTPSink() as sink,
+        patch.object(settings, "SMTP_HOST", sink.host),
+        patch.object(settings, "SMTP_PORT", sink.port),
+        patch.object(settings, "SMTP_TLS", False),
+        patch.object(settings, "SMTP_USER", "user"),
+        patch.object(settings, "SMTP_PASSWORD", "secret"),
+        patch.object(settings, "EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        yield sink
+        smtp_transport.close()
@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import pytest
+
+from app.utils.analytics_spool import AnalyticsSpool, Message
+
+
+class FlakySink:
+    def __init__(self, fail_after: int | None = None) -> None:
+        self.fail_after = fail_after
+        self.received: list[Message] = []
+
+    def __call__(self, batch: list[Message]) -> None:
+        if self.fail_after is not None and len(self.received) >= self.fail_after:
+            raise ConnectionError("sink unavailable")
+        self.received.extend(batch)
+
+
+def test_drain_replays_events_in_order(tmp_path: Path) -> None:
+    spool = AnalyticsSpool(
+        tmp_path,
+        segment_max_bytes=1024 * 1024,
+        max_bytes=10 * 1024 * 1024,
+        fsync_every=1,
+        fsync_interval=1,
+        batch_size=2,
+    )
+    for n in range(5):
+        spool.append({"event": "e", "n": n})
+    sink = FlakySink()
+
+    assert spool.drain(sink) == 5
+    assert [message["n"] for message in sink.received] == list(range(5))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_drain_resumes_after_last_batch(tmp_path: Path) -> None:
+    spool = AnalyticsSpool(
+        tmp_path,
+        segment_max_bytes=1024 * 1024,
+        max_bytes=10 * 1024 * 1024,
+        fsync_every=1,
+        fsync_interval=1,
+        batch_size=2,
+    )
+    for n in range(5):
+        spool.append({"n": n})
+    sink = FlakySink(fail_after=2)
+
+    with pytest.raises(ConnectionError):
+        spool.drain(sink)
+
+    sink.fail_after = None
+    assert spool.drain(sink) == 3
+    assert [message["n"] for message in sink.received] == list(range(5))
+
+
+def test_restart_replays_abandoned_segment(tmp_path: Path) -> None:
+    crashed = AnalyticsSpool(
+        tmp_path,
+        segment_max_bytes=1024 * 1024,
+        max_bytes=10 * 1024 * 1024,
+        fsync_every=1,
+        fsync_interval=1,
+        batch_size=2,
+    )
+    crashed.append({"n": 1})
+    # The process died without sealing its segment and left a torn write
+    assert crashed._file is not None
+    crashed._file.write(b'{"n": ')
+    crashed._file.close()
+    crashed._file = None
+
+    restarted = AnalyticsSpool(
+        tmp_path,
+        segment_max_bytes=1024 * 1024,
+        max_bytes=10 * 1024 * 1024,
+        fsync_every=1,
+        fsync_interval=1,
+        batch_size=2,
+    )
+    sink = FlakySink()
+    assert restarted.drain(sink) == 1
+    assert sink.received == [{"n": 1}]
+
+
+def test_live_segment_of_another_process_is_left_alone(tmp_path: Path) -> None:
+    other = AnalyticsSpool(
+        tmp_path,
+        segment_max_bytes=1024 * 1024,
+        max_bytes=10 * 1024 * 1024,
+        fsync_every=1,
+        fsync_interval=1,
+        batch_size=2,
+    )
+    other.append({"n": 1})
+
+    spool = AnalyticsSpool(
+        tmp_path,
+        segment_max_bytes=1024 * 1024,
+        max_bytes=10 * 1024 * 1024,
+        fsync_every=1,
+        fsync_interval=1,
+        batch_size=2,
+    )
+    assert spool.drain(FlakySink()) == 0
+    assert other.drain(FlakySink()) == 1
+
+
+def test_full_spool_drops_oldest_segments(tmp_path: Path) -> None:
+    spool = AnalyticsSpool(
+        tmp_path,
+        segment_max_bytes=64,
+        max_bytes=128,
+        fsync_every=1,
+        fsync_interval=1,
+        batch_size=2,
+    )
+    for n in range(20):
+        spool.append({"event": "e", "n": n})
+    sink = FlakySink()
+
+    spool.drain(sink)
+
+    received = [message["n"] for message in sink.received]
+    assert 0 < len(received) < 20
+    assert received == list(range(20 - len(received), 20))
@@ -0,0 +1,100 @@
+import asyncio
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.core.config import settings
+from app.core.db_factory import (
+    EngineRegistry,
+    create_db_engine,
+    get_db_url,
+    get_engine,
+    get_pool_args,
+    get_pool_size,
+    get_pool_strategy,
+)
+
+
+def test_registry_creates_engines_lazily_and_once() -> None:
+    registry = EngineRegistry()
+    assert registry._engines == {}
+
+    engine = registry.get()
+    assert registry.get("primary") is engine
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == get_pool_size()
+
+
+def test_unconfigured_named_engines_share_the_primary() -> None:
+    registry = EngineRegistry()
+    with (
+        patch.object(settings, "DATABASE_REPLICA_URL", None),
+        patch.object(settings, "DATABASE_ANALYTICS_URL", None),
+    ):
+        primary = registry.get()
+        assert registry.get("replica") is primary
+        assert registry.get("analytics") is primary
+        assert registry.get_async("replica") is registry.get_async()
+
+
+def test_configured_named_engine_gets_its_own_pool() -> None:
+    registry = EngineRegistry()
+    with patch.object(settings, "DATABASE_REPLICA_URL", get_db_url()):
+        replica = registry.get("replica")
+    assert replica is not registry.get()
+
+
+def test_dispose_forgets_engines() -> None:
+    registry = EngineRegistry()
+    engine = registry.get()
+    registry.get_async()
+    asyncio.run(registry.dispose())
+    assert registry._engines == {}
+    assert registry._async_engines == {}
+    assert registry.get() is not engine
+
+
+def test_pool_size_is_split_between_workers() -> None:
+    with (
+        patch.object(settings, "DATABASE_POOL_SIZE", None),
+        patch.object(settings, "DATABASE_POOL_BUDGET", 12),
+        patch.object(settings, "WEB_CONCURRENCY", 4),
+    ):
+        assert get_pool_size() == 3
+        with patch.object(settings, "DATABASE_POOL_SIZE", 7):
+            assert get_pool_size() == 7
+
+
+def test_auto_strategy_follows_pooler_mode() -> None:
+    assert get_pool_strategy() == "queue"
+    with (
+        patch.object(settings, "DATABASE_TYPE", "supabase"),
+        patch.object(settings, "SUPABASE_DB_POOL_MODE", "transaction"),
+    ):
+        assert get_pool_strategy() == "lifo"
+        with patch.object(settings, "DATABASE_POOL_STRATEGY", "null"):
+            assert get_pool_strategy() == "null"
+
+
+def test_pool_args_per_strategy() -> None:
+    assert get_pool_args("null") == {"poolclass": NullPool}
+    lifo = get_pool_args("lifo")
+    assert lifo["pool_use_lifo"] is True
+    assert lifo["pool_size"] <= 2
+    assert lifo["pool_pre_ping"] is False
+    assert get_pool_args("queue")["pool_pre_ping"] is False
+
+
+def test_idle_check_replaces_dead_connections() -> None:
+    engine = create_db_engine(strategy="queue")
+    with engine.connect() as connection:
+        pid = connection.execute(text("SELECT pg_backend_pid()")).scalar_one()
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": pid})
+
+    with patch.object(settings, "DATABASE_POOL_IDLE_CHECK_SECONDS", 0):
+        with engine.connect() as connection:
+            new_pid = connection.execute(text("SELECT pg_backend_pid()")).scalar_one()
+    assert new_pid != pid
+    engine.dispose()
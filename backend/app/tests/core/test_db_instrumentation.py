@@ -0,0 +1,104 @@
+import logging
+import time
+from collections.abc import Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app.api.middlewares import QueryStatsMiddleware
+from app.core.db_factory import get_engine
+from app.core.db_instrumentation import (
+    QueryStats,
+    RouteQueryStats,
+    RouteStats,
+    normalize_statement,
+    report_repeated_statements,
+    route_query_stats,
+    track_queries,
+)
+
+
+def test_normalize_statement_ignores_literals_and_spacing() -> None:
+    assert normalize_statement("SELECT 1  FROM item\nWHERE title = 'a'") == (
+        "SELECT ? FROM item WHERE title = ?"
+    )
+
+
+def test_track_queries_records_engine_activity() -> None:
+    with track_queries() as stats:
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+    assert stats.queries == 2
+    assert stats.db_time >= stats.slowest_time > 0
+    assert stats.checkout_wait > 0
+    assert stats.slowest_statement in ("SELECT 1", "SELECT 2")
+    assert stats.server_timing().startswith('db;desc="2 queries";dur=')
+
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 3"))
+    assert stats.queries == 2
+
+
+def test_route_stats_aggregate_requests() -> None:
+    routes = RouteQueryStats()
+    first = QueryStats()
+    first.record_query("SELECT 1", 0.002)
+    second = QueryStats()
+    second.record_query("SELECT 2", 0.005)
+    second.record_query("SELECT 3", 0.001)
+    routes.add("GET /items/", first)
+    routes.add("GET /items/", second)
+
+    totals = routes.snapshot()["GET /items/"]
+    assert totals.requests == 2
+    assert totals.queries == 3
+    assert totals.db_time == pytest.approx(0.008)
+    assert totals.max_db_time == pytest.approx(0.006)
+    assert totals.slowest_statement == "SELECT 2"
+
+
+def test_repeated_statements_are_reported(caplog: pytest.LogCaptureFixture) -> None:
+    stats = QueryStats()
+    for item_id in range(12):
+        stats.record_query(f"SELECT * FROM item WHERE id = {item_id}", 0.001)
+    stats.record_query("SELECT * FROM user", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="app.db_instrumentation"):
+        report_repeated_statements("GET /items/", stats)
+    assert len(caplog.records) == 1
+    assert "12 similar statements" in caplog.records[0].getMessage()
+
+
+def test_middleware_counts_queries_of_streamed_bodies() -> None:
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    def body() -> Iterator[bytes]:
+        yield b"started\n"
+        # Give a middleware that stops at the response start time to finish
+        time.sleep(0.1)
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+        yield b"done\n"
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(body())
+
+    before = route_query_stats.snapshot().get("GET /stream", RouteStats())
+    labels = {"route": "stream_stream_get", "method": "GET"}
+    observed = REGISTRY.get_sample_value("http_request_db_queries_sum", labels)
+    response = TestClient(app).get("/stream")
+
+    assert response.text == "started\ndone\n"
+    totals = route_query_stats.snapshot()["GET /stream"]
+    assert totals.requests == before.requests + 1
+    assert totals.queries == before.queries + 1
+    assert REGISTRY.get_sample_value("http_request_db_queries_sum", labels) == (
+        (observed or 0) + 1
+    )
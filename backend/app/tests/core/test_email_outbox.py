@@ -0,0 +1,156 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, delete, select
+
+from app import crud
+from app.core.config import settings
+from app.core.db_factory import get_engine
+from app.core.email_outbox import EmailOutboxWorker
+from app.models import EmailOutbox
+from app.tests.utils.smtp_sink import SMTPSink
+from app.tests.utils.utils import random_email
+
+
+@pytest.fixture
+def outbox(db: Session) -> Generator[None, None, None]:
+    db.execute(delete(EmailOutbox))
+    db.commit()
+    yield
+    db.execute(delete(EmailOutbox))
+    db.commit()
+
+
+def queue_email(db: Session) -> EmailOutbox:
+    email = crud.add_outbox_email(
+        session=db, email_to=random_email(), subject="Hello", html_content="<p/>"
+    )
+    db.commit()
+    return email
+
+
+@pytest.mark.usefixtures("outbox")
+def test_worker_sends_batch_over_one_session(db: Session, smtp_sink: SMTPSink) -> None:
+    emails = [queue_email(db) for _ in range(3)]
+    worker = EmailOutboxWorker(
+        batch_size=10,
+        poll_interval=0,
+        max_attempts=3,
+        backoff=30,
+        max_backoff=3600,
+        retention=3600,
+    )
+
+    assert worker.run_once() == 3
+
+    assert smtp_sink.stats.connections == 1
+    assert sorted(message.rcpt_to[0] for message in smtp_sink.stats.messages) == (
+        sorted(f"<{email.email_to}>" for email in emails)
+    )
+    for email in emails:
+        db.refresh(email)
+        assert email.status == "sent"
+        assert email.attempts == 1
+        assert email.sent_at is not None
+    assert worker.run_once() == 0
+
+
+@pytest.mark.usefixtures("outbox")
+def test_unreachable_server_is_retried(db: Session) -> None:
+    email = queue_email(db)
+    worker = EmailOutboxWorker(
+        batch_size=10,
+        poll_interval=0,
+        max_attempts=3,
+        backoff=30,
+        max_backoff=3600,
+        retention=3600,
+    )
+
+    with (
+        patch.object(settings, "SMTP_HOST", "127.0.0.1"),
+        patch.object(settings, "SMTP_PORT", 1),
+        patch.object(settings, "SMTP_TLS", False),
+        patch.object(settings, "EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        assert worker.run_once() == 1
+
+    db.refresh(email)
+    assert email.status == "pending"
+    assert email.attempts == 1
+    assert email.last_error
+
+
+@pytest.mark.usefixtures("outbox")
+def test_rejected_email_is_retried_with_backoff(
+    db: Session, smtp_sink: SMTPSink
+) -> None:
+    email = queue_email(db)
+    worker = EmailOutboxWorker(
+        batch_size=10,
+        poll_interval=0,
+        max_attempts=2,
+        backoff=30,
+        max_backoff=3600,
+        retention=3600,
+    )
+    smtp_sink.data_reply = "451 4.3.0 Try again later"
+
+    assert worker.run_once() == 1
+    db.refresh(email)
+    assert email.status == "pending"
+    assert email.next_attempt_at is not None
+    assert email.next_attempt_at > datetime.now(timezone.utc)
+    assert "Try again later" in (email.last_error or "")
+    # Not due again until the backoff has passed
+    assert worker.run_once() == 0
+
+    email.next_attempt_at = datetime.now(timezone.utc)
+    db.add(email)
+    db.commit()
+    assert worker.run_once() == 1
+
+    db.refresh(email)
+    assert email.status == "failed"
+    assert email.attempts == 2
+    assert smtp_sink.stats.messages == []
+
+
+@pytest.mark.usefixtures("outbox")
+def test_expired_emails_are_purged(db: Session) -> None:
+    old = datetime.now(timezone.utc) - timedelta(hours=2)
+    sent, failed, pending, recent = (queue_email(db) for _ in range(4))
+    sent.status, sent.created_at = "sent", old
+    failed.status, failed.created_at = "failed", old
+    pending.created_at = old
+    recent.status = "sent"
+    db.add_all([sent, failed, pending, recent])
+    db.commit()
+    worker = EmailOutboxWorker(
+        batch_size=10,
+        poll_interval=0,
+        max_attempts=3,
+        backoff=30,
+        max_backoff=3600,
+        retention=3600,
+    )
+
+    assert worker.purge_expired() == 2
+
+    remaining = db.exec(select(EmailOutbox.id)).all()
+    assert sorted(remaining) == sorted([pending.id, recent.id])
+
+
+@pytest.mark.usefixtures("outbox")
+def test_claimed_emails_are_skipped_by_other_workers(db: Session) -> None:
+    first = queue_email(db)
+    second = queue_email(db)
+
+    with Session(get_engine()) as session:
+        claimed = crud.claim_outbox_emails(session=session, limit=1)
+        assert [email.id for email in claimed] == [first.id]
+        with Session(get_engine()) as other:
+            others = crud.claim_outbox_emails(session=other, limit=10)
+            assert [email.id for email in others] == [second.id]
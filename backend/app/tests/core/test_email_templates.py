@@ -0,0 +1,56 @@
+import os
+from pathlib import Path
+
+from jinja2 import Template
+
+from app.utils.email import render_email_template, render_email_templates
+from app.utils.email_templates import TEMPLATES_DIR, EmailTemplates
+
+
+def test_registry_matches_uncached_rendering() -> None:
+    context = {"project_name": "Project", "email": "user@example.com"}
+    expected = Template((TEMPLATES_DIR / "test_email.html").read_text()).render(context)
+
+    assert render_email_template(template_name="test_email.html", context=context) == (
+        expected
+    )
+
+
+def test_batch_rendering() -> None:
+    contexts = [
+        {"project_name": "Project", "email": f"user{n}@example.com"} for n in range(3)
+    ]
+
+    rendered = render_email_templates(
+        template_name="test_email.html", contexts=contexts
+    )
+
+    assert len(rendered) == 3
+    for n, html in enumerate(rendered):
+        assert f"user{n}@example.com" in html
+
+
+def test_bytecode_cache_is_written(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    templates = EmailTemplates(TEMPLATES_DIR, cache_dir=cache_dir, auto_reload=False)
+
+    templates.precompile()
+
+    assert len(list(cache_dir.iterdir())) == len(list(TEMPLATES_DIR.glob("*.html")))
+
+
+def test_auto_reload_picks_up_changes(tmp_path: Path) -> None:
+    template = tmp_path / "hello.html"
+    template.write_text("Hello {{ name }}")
+    reloading = EmailTemplates(tmp_path, cache_dir=None, auto_reload=True)
+    static = EmailTemplates(tmp_path, cache_dir=None, auto_reload=False)
+    assert reloading.render("hello.html", {"name": "a"}) == "Hello a"
+    assert static.render("hello.html", {"name": "a"}) == "Hello a"
+
+    template.write_text("Bye {{ name }}")
+    # Make sure the modification time moves even on coarse filesystems
+    mtime = template.stat().st_mtime + 10
+    os.utime(template, (mtime, mtime))
+
+    assert reloading.render("hello.html", {"name": "a"}) == "Bye a"
+    assert static.render("hello.html", {"name": "a"}) == "Hello a"
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.password_hasher import PasswordHasher, PasswordHasherBusyError
+from app.core.security import verify_password
+
+
+def test_inline_hash_and_verify() -> None:
+    hasher = PasswordHasher(processes=0, max_pending=4, queue_timeout=0)
+    observed = REGISTRY.get_sample_value("password_hasher_duration_seconds_count")
+    hashed = hasher.hash("s3cret-password")
+    assert verify_password("s3cret-password", hashed)
+    assert hasher.verify("s3cret-password", hashed)
+    assert not hasher.verify("wrong-password", hashed)
+    stats = hasher.stats()
+    assert stats["operations"] == 3
+    assert stats["queue_depth"] == 0
+    assert stats["latency_seconds_total"] > 0
+    assert REGISTRY.get_sample_value("password_hasher_duration_seconds_count") == (
+        (observed or 0) + 3
+    )
+
+
+def test_process_pool_hash_and_verify() -> None:
+    hasher = PasswordHasher(processes=1, max_pending=4, queue_timeout=0)
+    try:
+        hashed = hasher.hash("s3cret-password")
+        assert hasher.verify("s3cret-password", hashed)
+        assert asyncio.run(hasher.verify_async("s3cret-password", hashed))
+        assert verify_password("x", asyncio.run(hasher.hash_async("x")))
+    finally:
+        hasher.shutdown()
+
+
+def test_inline_async_runs_off_the_event_loop() -> None:
+    hasher = PasswordHasher(processes=0, max_pending=4, queue_timeout=0)
+    threads: list[int] = []
+
+    def record_thread(password: str) -> str:
+        threads.append(threading.get_ident())
+        return password
+
+    async def hash_password() -> None:
+        with patch(
+            "app.core.password_hasher.security.get_password_hash", record_thread
+        ):
+            await hasher.hash_async("s3cret-password")
+        threads.append(threading.get_ident())
+
+    asyncio.run(hash_password())
+    assert threads[0] != threads[1]
+
+
+def test_async_callers_wait_for_a_slot() -> None:
+    hasher = PasswordHasher(processes=0, max_pending=1, queue_timeout=5)
+    hasher._acquire(0)
+    threading.Timer(0.1, hasher._release, args=(time.perf_counter(),)).start()
+
+    hashed = asyncio.run(hasher.hash_async("s3cret-password"))
+
+    assert verify_password("s3cret-password", hashed)
+    assert hasher.stats()["rejected"] == 0
+
+
+def test_full_queue_rejects_requests() -> None:
+    hasher = PasswordHasher(processes=0, max_pending=1, queue_timeout=0)
+    hasher._acquire(0)
+    with pytest.raises(PasswordHasherBusyError):
+        hasher.hash("s3cret-password")
+    with pytest.raises(PasswordHasherBusyError):
+        asyncio.run(hasher.hash_async("s3cret-password"))
+    assert hasher.stats()["rejected"] == 2
+    assert hasher.stats()["queue_depth"] == 1
+    depth = REGISTRY.get_sample_value("password_hasher_queue_depth")
+    assert depth is not None
+    hasher._release(time.perf_counter())
+    assert REGISTRY.get_sample_value("password_hasher_queue_depth") == depth - 1
@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middlewares import PostHogMiddleware
+from app.core.config import settings
+from app.utils.posthog_pipeline import PostHogPipeline
+from app.utils.posthog_tracker import PostHogTracker
+
+
+def test_summaries_group_requests_by_route() -> None:
+    pipeline = PostHogPipeline(
+        buffer_size=100, flush_interval=60, sample_rate=1.0, route_sample_rates={}
+    )
+    pipeline.record("/items/{id}", "GET", 200, 0.002)
+    pipeline.record("/items/{id}", "GET", 200, 0.2)
+    pipeline.record("/items/{id}", "GET", 404, 0.001)
+
+    summaries = pipeline.summarize()
+
+    found = summaries[("/items/{id}", "GET", 200)]
+    assert found.count == 2
+    assert found.duration_max == 0.2
+    assert found.latency_buckets == {"5": 1, "250": 1}
+    assert summaries[("/items/{id}", "GET", 404)].count == 1
+    assert pipeline.summarize() == {}
+
+
+def test_sampled_requests_are_weighted() -> None:
+    pipeline = PostHogPipeline(
+        buffer_size=100,
+        flush_interval=60,
+        sample_rate=0.5,
+        route_sample_rates={"/utils/health-check/": 0},
+    )
+    with patch("app.utils.posthog_pipeline.random.random", return_value=0.1):
+        pipeline.record("/items/", "GET", 200, 0.01)
+        pipeline.record("/utils/health-check/", "GET", 200, 0.01)
+
+    summaries = pipeline.summarize()
+
+    assert list(summaries) == [("/items/", "GET", 200)]
+    assert summaries[("/items/", "GET", 200)].count == 2
+
+
+def test_full_buffer_drops_oldest_samples() -> None:
+    pipeline = PostHogPipeline(
+        buffer_size=2, flush_interval=60, sample_rate=1.0, route_sample_rates={}
+    )
+    for status_code in (200, 201, 202):
+        pipeline.record("/items/", "POST", status_code, 0.01)
+
+    assert pipeline.dropped == 1
+    assert set(pipeline.summarize()) == {
+        ("/items/", "POST", 201),
+        ("/items/", "POST", 202),
+    }
+
+
+def test_flush_sends_one_event_per_group() -> None:
+    pipeline = PostHogPipeline(
+        buffer_size=1, flush_interval=60, sample_rate=1.0, route_sample_rates={}
+    )
+    pipeline.record("/items/", "GET", 200, 0.01)
+    pipeline.record("/items/", "GET", 200, 0.03)
+
+    with patch.object(PostHogTracker, "capture_event") as capture_event:
+        pipeline.flush()
+
+    capture_event.assert_called_once()
+    kwargs = capture_event.call_args.kwargs
+    assert kwargs["event_name"] == "api_request_summary"
+    assert kwargs["properties"]["count"] == 1
+    assert kwargs["properties"]["path"] == "/items/"
+    assert pipeline.dropped == 0
+
+
+def test_middleware_records_route_template() -> None:
+    pipeline = PostHogPipeline(
+        buffer_size=100, flush_interval=60, sample_rate=1.0, route_sample_rates={}
+    )
+    app = FastAPI()
+    app.add_middleware(PostHogMiddleware, pipeline=pipeline)
+
+    @app.get(f"{settings.API_V1_STR}/things/{{thing_id}}")
+    def read_thing(thing_id: int) -> dict[str, int]:
+        return {"id": thing_id}
+
+    @app.get("/outside")
+    def outside() -> dict[str, str]:
+        return {}
+
+    client = TestClient(app)
+    client.get(f"{settings.API_V1_STR}/things/1")
+    client.get(f"{settings.API_V1_STR}/things/2")
+    client.get(f"{settings.API_V1_STR}/missing")
+    client.get("/outside")
+
+    summaries = pipeline.summarize()
+
+    assert (
+        summaries[(f"{settings.API_V1_STR}/things/{{thing_id}}", "GET", 200)].count == 2
+    )
+    assert summaries[("unmatched", "GET", 404)].count == 1
+    assert len(summaries) == 2
@@ -0,0 +1,67 @@
+import uuid
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from app.core.principal_cache import Principal, PrincipalCache
+
+
+def _principal() -> Principal:
+    return Principal(id=uuid.uuid4(), is_active=True, is_superuser=False)
+
+
+def _lookups(result: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "principal_cache_lookups_total", {"result": result}
+    )
+    return value or 0.0
+
+
+def test_get_counts_hits_and_misses() -> None:
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    principal = _principal()
+    hits, misses = _lookups("hit"), _lookups("miss")
+    assert cache.get(principal.id) is None
+    cache.set(principal)
+    assert cache.get(principal.id) == principal
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+    assert (_lookups("hit"), _lookups("miss")) == (hits + 1, misses + 1)
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache = PrincipalCache(max_size=10, ttl_seconds=30)
+    principal = _principal()
+    with patch("app.core.principal_cache.time.monotonic", return_value=100.0):
+        cache.set(principal)
+    with patch("app.core.principal_cache.time.monotonic", return_value=129.0):
+        assert cache.get(principal.id) == principal
+    with patch("app.core.principal_cache.time.monotonic", return_value=130.0):
+        assert cache.get(principal.id) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    first, second, third = _principal(), _principal(), _principal()
+    cache.set(first)
+    cache.set(second)
+    cache.get(first.id)
+    cache.set(third)
+    assert cache.get(second.id) is None
+    assert cache.get(first.id) == first
+    assert cache.get(third.id) == third
+
+
+def test_invalidate_removes_entry() -> None:
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    principal = _principal()
+    cache.set(principal)
+    cache.invalidate(principal.id)
+    assert cache.get(principal.id) is None
+
+
+def test_disabled_cache_stores_nothing() -> None:
+    cache = PrincipalCache(max_size=10, ttl_seconds=0)
+    principal = _principal()
+    cache.set(principal)
+    assert cache.get(principal.id) is None
@@ -0,0 +1,48 @@
+import asyncio
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.core.db_factory import engines, get_db_url, get_engine
+from app.core.replica import ReplicaRouter, parse_lsn
+
+
+@pytest.fixture
+def replica_url() -> Generator[str, None, None]:
+    # The primary stands in for a replica that is always caught up
+    url = get_db_url()
+    with patch.object(settings, "DATABASE_REPLICA_URL", url):
+        yield url
+    asyncio.run(engines.dispose())
+
+
+def test_parse_lsn_orders_positions() -> None:
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("1/0") > parse_lsn("0/FFFFFFFF")
+    with pytest.raises(ValueError):
+        parse_lsn("not-an-lsn")
+
+
+def test_reads_use_primary_without_replica() -> None:
+    router = ReplicaRouter()
+    assert not router.enabled
+    assert router.read_engine(None) is get_engine()
+
+
+@pytest.mark.usefixtures("replica_url")
+def test_reads_without_token_use_replica() -> None:
+    router = ReplicaRouter()
+    assert router.read_engine(None) is get_engine("replica")
+    assert get_engine("replica") is not get_engine()
+
+
+@pytest.mark.usefixtures("replica_url")
+def test_token_routes_to_replica_once_caught_up() -> None:
+    router = ReplicaRouter()
+    token = router.primary_lsn()
+    assert router.read_engine(token) is get_engine("replica")
+    assert router.read_engine("FFFFFFFF/0") is get_engine()
+    with pytest.raises(ValueError):
+        router.read_engine("bogus")
@@ -0,0 +1,71 @@
+import socket
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.tests.utils.smtp_sink import SMTPSink
+from app.utils import send_email
+from app.utils.smtp_transport import SMTPConnectionPool, smtp_transport
+
+
+def test_messages_reuse_one_session(smtp_sink: SMTPSink) -> None:
+    for n in range(3):
+        send_email(email_to=f"user{n}@example.com", subject="Hi", html_content="<p/>")
+
+    assert smtp_sink.stats.connections == 1
+    assert [message.rcpt_to for message in smtp_sink.stats.messages] == [
+        ["<user0@example.com>"],
+        ["<user1@example.com>"],
+        ["<user2@example.com>"],
+    ]
+
+
+def test_burst_is_sent_over_one_session(smtp_sink: SMTPSink) -> None:
+    with smtp_transport.session() as session:
+        for n in range(5):
+            send_email(
+                email_to=f"user{n}@example.com", html_content="<p/>", session=session
+            )
+
+    assert smtp_sink.stats.connections == 1
+    assert len(smtp_sink.stats.messages) == 5
+
+
+def test_idle_sessions_are_replaced(smtp_sink: SMTPSink) -> None:
+    options = {"host": smtp_sink.host, "port": smtp_sink.port}
+    pool = SMTPConnectionPool(options, size=1, idle_timeout=0, health_check_after=0)
+    with pool.session():
+        pass
+    with pool.session():
+        pass
+
+    assert pool.opened == 2
+    pool.close()
+
+
+def test_broken_session_fails_health_check(smtp_sink: SMTPSink) -> None:
+    options = {"host": smtp_sink.host, "port": smtp_sink.port}
+    pool = SMTPConnectionPool(options, size=1, idle_timeout=60, health_check_after=0)
+    with pool.session() as session:
+        first = session
+    # The server dropped the connection while it sat idle
+    first.backend.get_client().sock.shutdown(socket.SHUT_RDWR)
+
+    with pool.session() as session:
+        assert session is not first
+        assert session.is_healthy()
+    assert pool.opened == 2
+    pool.close()
+
+
+def test_send_email_raises_when_server_is_unreachable() -> None:
+    with (
+        patch.object(settings, "SMTP_HOST", "127.0.0.1"),
+        patch.object(settings, "SMTP_PORT", 1),
+        patch.object(settings, "SMTP_TLS", False),
+        patch.object(settings, "EMAILS_FROM_EMAIL", "noreply@example.com"),
+        pytest.raises(OSError),
+    ):
+        send_email(email_to="user@example.com", html_content="<p/>")
+    smtp_transport.close()
@@ -0,0 +1,64 @@
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.user_purge import UserPurger
+from app.models import Item, ItemCreate, User, UserCreate, UserPurge
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def create_user_with_items(db: Session, count: int) -> User:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+    user = crud.create_user(session=db, user_create=user_in)
+    items_in = [ItemCreate(title=f"Purged {i}") for i in range(count)]
+    crud.create_items(session=db, items_in=items_in, owner_id=user.id)
+    return user
+
+
+def test_abandoned_purge_is_resumed(db: Session) -> None:
+    user = create_user_with_items(db, 5)
+    user_id = user.id
+    crud.schedule_user_purge(session=db, user_id=user_id, total=5)
+    db.commit()
+    purger = UserPurger(chunk_size=2, lease=60, poll_interval=0)
+    # A worker claimed the purge and died after its first chunk
+    claimed = crud.claim_user_purge(session=db, user_id=user_id, lease=60)
+    assert claimed is not None
+    crud.delete_items_chunk(session=db, owner_id=user_id, chunk_size=2)
+    crud.update_user_purge(session=db, user_id=user_id, deleted=2)
+    db.commit()
+
+    # Still within its lease
+    assert purger.run_pending() == 0
+    db.execute(
+        text(
+            "UPDATE userpurge SET updated_at = now() - interval '2 minutes'"
+            " WHERE user_id = :user_id"
+        ),
+        {"user_id": user_id},
+    )
+    db.commit()
+    assert purger.run_pending() == 1
+
+    db.expire_all()
+    job = db.get(UserPurge, user_id)
+    assert job is not None
+    assert (job.status, job.total, job.deleted) == ("done", 5, 5)
+    assert db.get(User, user_id) is None
+    assert not db.exec(select(Item).where(Item.owner_id == user_id)).first()
+
+
+def test_purge_is_scheduled_once_at_a_time(db: Session) -> None:
+    user_id = create_user_with_items(db, 1).id
+
+    assert crud.schedule_user_purge(session=db, user_id=user_id, total=1)
+    db.commit()
+    assert not crud.schedule_user_purge(session=db, user_id=user_id, total=1)
+    db.commit()
+
+    # A finished purge can be scheduled again
+    purger = UserPurger(chunk_size=2, lease=60, poll_interval=0)
+    purger.run(user_id)
+    assert crud.schedule_user_purge(session=db, user_id=user_id, total=0)
+    db.commit()
+    purger.run(user_id)
@@ -0,0 +1,55 @@
+import time
+import uuid
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.uuid7 import UUID7Generator, uuid7
+from app.models import Item, User
+
+
+def test_layout() -> None:
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before <= value.int >> 80 <= after
+
+
+def test_ids_increase_within_a_millisecond() -> None:
+    generator = UUID7Generator()
+    with patch("app.core.uuid7.time.time_ns", return_value=1_700_000_000_000_000_000):
+        values = [generator() for _ in range(5000)]
+
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    # The counter overflowed into the next millisecond rather than wrapping
+    assert values[-1].int >> 80 > values[0].int >> 80
+
+
+def test_ids_increase_when_the_clock_steps_back() -> None:
+    generator = UUID7Generator()
+    with patch("app.core.uuid7.time.time_ns", return_value=2_000_000_000):
+        first = generator()
+    with patch("app.core.uuid7.time.time_ns", return_value=1_000_000_000):
+        second = generator()
+
+    assert second > first
+
+
+def test_models_default_to_uuid7() -> None:
+    assert User(email="user@example.com", hashed_password="x").id.version == 7
+    assert Item(title="Item", owner_id=uuid.uuid4()).id.version == 7
+
+
+def test_database_default_is_uuid7(db: Session) -> None:
+    values = [db.execute(text("SELECT uuid_generate_v7()")).scalar() for _ in range(3)]
+
+    for value in values:
+        assert isinstance(value, uuid.UUID)
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+        assert abs((value.int >> 80) - time.time() * 1000) < 60_000
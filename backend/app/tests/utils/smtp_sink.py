@@ -0,0 +1,131 @@
+"""A local SMTP server that accepts and records every message.
+
+Stands in for a real mail server in tests and benchmarks. It speaks just
+enough ESMTP for ``smtplib``: EHLO/HELO, AUTH (any credentials), MAIL, RCPT,
+DATA, RSET, NOOP and QUIT. STARTTLS is not offered, so clients must connect
+with TLS disabled. ``greeting_delay`` simulates the cost of a connection
+handshake, and setting ``data_reply`` to an error reply makes the sink reject
+messages after receiving them.
+"""
+
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from types import TracebackType
+
+from typing_extensions import Self
+
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    rcpt_to: list[str]
+    data: bytes
+
+
+@dataclass
+class SinkStats:
+    connections: int = 0
+    messages: list[ReceivedMessage] = field(default_factory=list)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    server: "_SinkServer"
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        with self.server.lock:
+            self.server.stats.connections += 1
+        if self.server.greeting_delay:
+            time.sleep(self.server.greeting_delay)
+        self.reply("220 smtp-sink ready")
+        mail_from = ""
+        rcpt_to: list[str] = []
+        for raw in self.rfile:
+            line = raw.decode().rstrip("\r\n")
+            command = line[:4].upper()
+            if command == "EHLO":
+                self.reply("250-smtp-sink")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250 SIZE 10485760")
+            elif command == "HELO":
+                self.reply("250 smtp-sink")
+            elif command == "AUTH":
+                self.reply("235 Authentication succeeded")
+            elif command == "MAIL":
+                mail_from, rcpt_to = line.split(":", 1)[1].split()[0], []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                rcpt_to.append(line.split(":", 1)[1].strip())
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                data_reply = self.server.data_reply
+                if data_reply.startswith("250"):
+                    with self.server.lock:
+                        self.server.stats.messages.append(
+                            ReceivedMessage(mail_from, rcpt_to, data)
+                        )
+                self.reply(data_reply)
+            elif command in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, greeting_delay: float) -> None:
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.greeting_delay = greeting_delay
+        self.data_reply = "250 OK queued"
+        self.stats = SinkStats()
+        self.lock = threading.Lock()
+
+
+class SMTPSink:
+    def __init__(self, greeting_delay: float = 0) -> None:
+        self._server = _SinkServer(greeting_delay)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def host(self) -> str:
+        return "127.0.0.1"
+
+    @property
+    def port(self) -> int:
+        return int(self._server.server_address[1])
+
+    @property
+    def stats(self) -> SinkStats:
+        return self._server.stats
+
+    @property
+    def data_reply(self) -> str:
+        return self._server.data_reply
+
+    @data_reply.setter
+    def data_reply(self, reply: str) -> None:
+        self._server.data_reply = reply
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
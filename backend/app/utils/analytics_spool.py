@@ -0,0 +1,263 @@
+import fcntl
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, Any
+
+from app.core.config import settings
+from app.core.metrics import analytics_events_dropped
+
+logger = logging.getLogger("app.analytics_spool")
+
+Message = dict[str, Any]
+SendBatch = Callable[[list[Message]], None]
+
+_OPEN_SUFFIX = ".open"
+_SEALED_SUFFIX = ".jsonl"
+_OFFSET_SUFFIX = ".offset"
+
+
+def _try_lock(file: IO[bytes]) -> bool:
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+class AnalyticsSpool:
+    """Append-only on-disk queue between the analytics tracker and the sink.
+
+    Every process appends JSON lines to its own ``.open`` segment, which it
+    keeps locked while writing. Writes are fsynced every ``fsync_every``
+    messages or ``fsync_interval`` seconds, and the segment is sealed into a
+    ``.jsonl`` file once it reaches ``segment_max_bytes`` or when the drain
+    runs. The drain replays sealed segments oldest first, in batches; the byte
+    offset of the last acknowledged batch is kept next to the segment, so a
+    restart resumes where the previous process stopped. Segments left ``.open``
+    by a process that died are sealed by the next one to start.
+
+    Nothing is held in memory but the open file, so a sink outage only grows
+    the directory. Once it exceeds ``max_bytes`` the oldest segments are
+    deleted and counted as dropped.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        segment_max_bytes: int,
+        max_bytes: int,
+        fsync_every: int,
+        fsync_interval: float,
+        batch_size: int,
+    ) -> None:
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_bytes = max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._file: IO[bytes] | None = None
+        self._path: Path | None = None
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def append(self, message: Message) -> None:
+        line = json.dumps(message, default=str).encode() + b"\n"
+        with self._lock:
+            file = self._file or self._open_segment()
+            if file.tell() and file.tell() + len(line) > self.segment_max_bytes:
+                self._seal()
+                self._enforce_limit()
+                file = self._open_segment()
+            file.write(line)
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._synced_at >= self.fsync_interval
+            ):
+                self._sync()
+
+    def sync(self) -> None:
+        """Make every appended message durable."""
+        with self._lock:
+            self._sync()
+
+    def drain(self, send: SendBatch) -> int:
+        """Send every sealed segment, returning the number of messages sent.
+
+        Exceptions raised by ``send`` propagate after the progress made so far
+        has been recorded.
+        """
+        with self._lock:
+            if self._file is not None and self._file.tell():
+                self._seal()
+        self._seal_abandoned()
+        sent = 0
+        for path in self._segments(_SEALED_SUFFIX):
+            sent += self._drain_segment(path, send)
+        return sent
+
+    def start(self, send: SendBatch, interval: float, max_backoff: float) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(send, interval, max_backoff),
+            name="analytics-spool-drain",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the drain and seal what this process has written.
+
+        Pending messages are not sent here, so a slow sink cannot hold up
+        shutdown; the next process to start replays them.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self._file is not None:
+                self._seal()
+
+    def _run(self, send: SendBatch, interval: float, max_backoff: float) -> None:
+        failures = 0
+        delay = interval
+        while not self._stop.wait(delay):
+            try:
+                self.drain(send)
+            except Exception:
+                failures += 1
+                delay = min(max_backoff, interval * 2**failures)
+                delay *= random.uniform(0.5, 1)
+                logger.warning(
+                    f"Analytics sink unavailable, retrying in {delay:.1f}s",
+                    exc_info=True,
+                )
+            else:
+                failures = 0
+                delay = interval
+
+    def _open_segment(self) -> IO[bytes]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns():020d}-{os.getpid()}{_OPEN_SUFFIX}"
+        self._path = self.directory / name
+        self._file = open(self._path, "ab")
+        # Held for the life of the segment, so other processes know it is live
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self._file
+
+    def _sync(self) -> None:
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def _seal(self) -> None:
+        assert self._file is not None and self._path is not None
+        self._sync()
+        if self._file.tell():
+            self._path.rename(self._path.with_suffix(_SEALED_SUFFIX))
+        else:
+            self._path.unlink()
+        self._file.close()
+        self._file = None
+        self._path = None
+
+    def _seal_abandoned(self) -> None:
+        for path in self._segments(_OPEN_SUFFIX):
+            if path == self._path:
+                continue
+            try:
+                file = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with file:
+                if _try_lock(file) and path.exists():
+                    path.rename(path.with_suffix(_SEALED_SUFFIX))
+
+    def _segments(self, suffix: str) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        # Names start with a timestamp, so sorting them orders the segments
+        return sorted(self.directory.glob(f"*{suffix}"))
+
+    def _drain_segment(self, path: Path, send: SendBatch) -> int:
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return 0
+        with file:
+            # Another worker is draining it, or already finished and removed it
+            if not _try_lock(file) or not path.exists():
+                return 0
+            offset_path = path.with_suffix(_OFFSET_SUFFIX)
+            offset = int(offset_path.read_text()) if offset_path.exists() else 0
+            file.seek(offset)
+            sent = 0
+            batch: list[Message] = []
+            for line in file:
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    # A torn write from a process that died mid-append
+                    logger.warning(f"Skipping a corrupt line in {path.name}")
+                if len(batch) >= self.batch_size:
+                    send(batch)
+                    sent += len(batch)
+                    batch = []
+                    offset_path.write_text(str(file.tell()))
+            if batch:
+                send(batch)
+                sent += len(batch)
+            path.unlink()
+            offset_path.unlink(missing_ok=True)
+        return sent
+
+    def _enforce_limit(self) -> None:
+        segments = self._segments(_SEALED_SUFFIX)
+        total = sum(path.stat().st_size for path in segments)
+        for path in segments:
+            if total <= self.max_bytes:
+                break
+            try:
+                file = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with file:
+                if not _try_lock(file) or not path.exists():
+                    continue
+                size = path.stat().st_size
+                dropped = sum(1 for _ in file)
+                path.unlink()
+                path.with_suffix(_OFFSET_SUFFIX).unlink(missing_ok=True)
+            total -= size
+            analytics_events_dropped.inc(dropped)
+            logger.warning(
+                f"Analytics spool is over {self.max_bytes} bytes, "
+                f"dropped {dropped} events from {path.name}"
+            )
+
+
+analytics_spool = AnalyticsSpool(
+    Path(settings.POSTHOG_SPOOL_DIR),
+    segment_max_bytes=settings.POSTHOG_SPOOL_SEGMENT_BYTES,
+    max_bytes=settings.POSTHOG_SPOOL_MAX_BYTES,
+    fsync_every=settings.POSTHOG_SPOOL_FSYNC_EVERY,
+    fsync_interval=settings.POSTHOG_SPOOL_FSYNC_INTERVAL_SECONDS,
+    batch_size=settings.POSTHOG_SPOOL_BATCH_SIZE,
+)
@@ -0,0 +1,71 @@
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from jinja2 import (
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+)
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.email_templates")
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "email-templates" / "build"
+
+
+class EmailTemplates:
+    """Compiled email templates, loaded once and kept in memory.
+
+    Templates are compiled on first use, or all at once by ``precompile``, and
+    the compiled bytecode is also written to ``cache_dir`` so new processes skip
+    the compile step. With ``auto_reload`` a template is recompiled when its
+    file changes, which is only worth the stat call while editing templates.
+    """
+
+    def __init__(
+        self, directory: Path, *, cache_dir: Path | None, auto_reload: bool
+    ) -> None:
+        bytecode_cache: BytecodeCache | None = None
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+        self.environment = Environment(
+            loader=FileSystemLoader(directory),
+            bytecode_cache=bytecode_cache,
+            auto_reload=auto_reload,
+        )
+
+    def get(self, template_name: str) -> Template:
+        return self.environment.get_template(template_name)
+
+    def precompile(self) -> None:
+        names = self.environment.list_templates(extensions=["html"])
+        for name in names:
+            self.get(name)
+        logger.info(f"Compiled {len(names)} email templates")
+
+    def render(self, template_name: str, context: dict[str, Any]) -> str:
+        return self.get(template_name).render(context)
+
+    def render_many(
+        self, template_name: str, contexts: Iterable[dict[str, Any]]
+    ) -> list[str]:
+        """Render one template for every context, looking it up only once."""
+        template = self.get(template_name)
+        return [template.render(context) for context in contexts]
+
+
+email_templates = EmailTemplates(
+    TEMPLATES_DIR,
+    cache_dir=(
+        Path(settings.EMAIL_TEMPLATES_CACHE_DIR)
+        if settings.EMAIL_TEMPLATES_CACHE_DIR
+        else None
+    ),
+    auto_reload=settings.ENVIRONMENT == "local",
+)
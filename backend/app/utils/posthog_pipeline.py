@@ -0,0 +1,154 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple
+
+from app.core.config import settings
+from app.utils.posthog_tracker import PostHogTracker
+
+logger = logging.getLogger("app.posthog_pipeline")
+
+# Upper bounds of the latency buckets in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class RequestEvent(NamedTuple):
+    path: str
+    method: str
+    status_code: int
+    duration: float
+    # Number of requests this sample stands for, the inverse of the sample rate
+    weight: float
+
+
+@dataclass
+class RequestSummary:
+    """Requests with the same path, method and status seen during one window."""
+
+    count: float = 0.0
+    duration_total: float = 0.0
+    duration_max: float = 0.0
+    latency_buckets: dict[str, float] = field(default_factory=dict)
+
+    def add(self, event: RequestEvent) -> None:
+        self.count += event.weight
+        self.duration_total += event.duration * event.weight
+        self.duration_max = max(self.duration_max, event.duration)
+        duration_ms = event.duration * 1000
+        bucket = next(
+            (str(bound) for bound in LATENCY_BUCKETS_MS if duration_ms <= bound),
+            "+Inf",
+        )
+        self.latency_buckets[bucket] = (
+            self.latency_buckets.get(bucket, 0) + event.weight
+        )
+
+
+class PostHogPipeline:
+    """Samples API requests into a ring buffer and ships them as summaries.
+
+    ``record`` only appends to a bounded deque, so the request path never waits
+    on PostHog and memory stays fixed; when the buffer is full the oldest
+    samples are dropped. A background thread drains the buffer every flush
+    interval, aggregates samples per path, method and status, and sends one
+    ``api_request_summary`` event per group.
+    """
+
+    def __init__(
+        self,
+        *,
+        buffer_size: int,
+        flush_interval: float,
+        sample_rate: float,
+        route_sample_rates: dict[str, float],
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self.route_sample_rates = route_sample_rates
+        self.dropped = 0
+        self._buffer: deque[RequestEvent] = deque(maxlen=buffer_size)
+        self._window_started = time.time()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def record(self, path: str, method: str, status_code: int, duration: float) -> None:
+        rate = self.route_sample_rates.get(path, self.sample_rate)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(
+            RequestEvent(path, method, status_code, duration, 1 / min(rate, 1))
+        )
+
+    def summarize(self) -> dict[tuple[str, str, int], RequestSummary]:
+        """Drain the buffer and aggregate its samples."""
+        summaries: dict[tuple[str, str, int], RequestSummary] = {}
+        while True:
+            try:
+                event = self._buffer.popleft()
+            except IndexError:
+                break
+            key = (event.path, event.method, event.status_code)
+            summaries.setdefault(key, RequestSummary()).add(event)
+        return summaries
+
+    def flush(self) -> None:
+        window_started, self._window_started = self._window_started, time.time()
+        dropped, self.dropped = self.dropped, 0
+        for (path, method, status_code), summary in self.summarize().items():
+            properties: dict[str, Any] = {
+                "path": path,
+                "method": method,
+                "status_code": status_code,
+                "count": summary.count,
+                "duration_ms_total": summary.duration_total * 1000,
+                "duration_ms_max": summary.duration_max * 1000,
+                "latency_ms_buckets": summary.latency_buckets,
+                "window_start": window_started,
+                "window_end": self._window_started,
+            }
+            PostHogTracker.capture_event(
+                event_name="api_request_summary",
+                user_id="api-server",
+                properties=properties,
+            )
+        if dropped:
+            logger.warning(f"Dropped {dropped} PostHog samples, the buffer was full")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="posthog-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and ship what is still buffered."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        PostHogTracker.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush PostHog summaries")
+
+
+posthog_pipeline = PostHogPipeline(
+    buffer_size=settings.POSTHOG_BUFFER_SIZE,
+    flush_interval=settings.POSTHOG_FLUSH_INTERVAL_SECONDS,
+    sample_rate=settings.POSTHOG_SAMPLE_RATE,
+    route_sample_rates=settings.POSTHOG_ROUTE_SAMPLE_RATES,
+)
@@ -1,8 +1,32 @@
+import uuid
+from datetime import datetime, timezone
 from typing import Any
 
-import posthog
+from posthog.request import batch_post
 
 from app.core.config import settings
+from app.utils.analytics_spool import Message, analytics_spool
+
+
+def send_batch(batch: list[Message]) -> None:
+    """发送一批事件到 PostHog，失败时抛出异常以便稍后重试"""
+    batch_post(
+        settings.POSTHOG_API_KEY,
+        settings.POSTHOG_HOST,
+        timeout=settings.POSTHOG_TIMEOUT_SECONDS,
+        batch=batch,
+    )
+
+
+def _message(event: str, distinct_id: str, **fields: Any) -> Message:
+    # uuid 让 PostHog 对重放的事件去重
+    return {
+        "event": event,
+        "distinct_id": distinct_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "uuid": str(uuid.uuid4()),
+        **fields,
+    }
 
 
 class PostHogTracker:
@@ -17,11 +41,13 @@ class PostHogTracker:
         if not settings.posthog_enabled:
             return
 
-        posthog.capture(
-            distinct_id=user_id or "anonymous",
-            event=event_name,
-            properties=properties or {},
-            context=context or {},
+        analytics_spool.append(
+            _message(
+                event_name,
+                user_id or "anonymous",
+                properties=properties or {},
+                context=context or {},
+            )
         )
 
     @staticmethod
@@ -33,7 +59,14 @@ class PostHogTracker:
         if not settings.posthog_enabled:
             return
 
-        posthog.identify(
-            distinct_id=user_id,
-            properties=properties or {},
+        analytics_spool.append(
+            _message("$identify", user_id, properties={}, **{"$set": properties or {}})
         )
+
+    @staticmethod
+    def flush() -> None:
+        """将排队的事件写入磁盘"""
+        if not settings.posthog_enabled:
+            return
+
+        analytics_spool.sync()
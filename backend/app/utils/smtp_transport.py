@@ -0,0 +1,166 @@
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import emails
+from emails.backend import SMTPBackend
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.smtp_transport")
+
+
+class SMTPSession:
+    """One authenticated SMTP session, reused for every message sent through it."""
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        # Raise on failures instead of returning an unsuccessful response
+        self.backend = SMTPBackend(fail_silently=False, **options)
+        # Connect, STARTTLS and AUTH now, so a broken server fails the checkout
+        self.backend.get_client()
+        self.last_used = time.monotonic()
+
+    def send(self, message: emails.Message, email_to: str) -> Any:
+        response = message.send(to=email_to, smtp=self.backend)
+        self.last_used = time.monotonic()
+        return response
+
+    def is_healthy(self) -> bool:
+        try:
+            code, _ = self.backend.get_client().noop()
+        except (OSError, smtplib.SMTPException):
+            return False
+        return bool(code == 250)
+
+    def close(self) -> None:
+        try:
+            self.backend.close()
+        except (OSError, smtplib.SMTPException):
+            logger.debug("Error while closing an SMTP session", exc_info=True)
+
+
+class SMTPConnectionPool:
+    """Keeps up to ``size`` sessions open to one SMTP server.
+
+    Checkouts are bounded by ``size`` and block while every session is in use.
+    The most recently used idle session is handed out first, sessions idle for
+    longer than ``idle_timeout`` are closed, and a session that has not been
+    used for ``health_check_after`` seconds is probed with NOOP before reuse.
+    A session that raises while checked out is closed rather than returned.
+    """
+
+    def __init__(
+        self,
+        options: dict[str, Any],
+        *,
+        size: int,
+        idle_timeout: float,
+        health_check_after: float,
+    ) -> None:
+        self.options = options
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.opened = 0
+        self._idle: deque[SMTPSession] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def session(self) -> Iterator[SMTPSession]:
+        with self._slots:
+            session = self._checkout()
+            try:
+                yield session
+            except BaseException:
+                session.close()
+                raise
+            with self._lock:
+                self._idle.append(session)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for session in idle:
+            session.close()
+
+    def _checkout(self) -> SMTPSession:
+        while True:
+            with self._lock:
+                self._close_expired()
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                break
+            if time.monotonic() - session.last_used < self.health_check_after:
+                return session
+            if session.is_healthy():
+                return session
+            session.close()
+        session = SMTPSession(self.options)
+        self.opened += 1
+        return session
+
+    def _close_expired(self) -> None:
+        # The oldest sessions sit at the left end of the deque
+        now = time.monotonic()
+        while self._idle and now - self._idle[0].last_used > self.idle_timeout:
+            self._idle.popleft().close()
+
+
+def get_smtp_options() -> dict[str, Any]:
+    smtp_options: dict[str, Any] = {
+        "host": settings.SMTP_HOST,
+        "port": settings.SMTP_PORT,
+        "timeout": settings.SMTP_TIMEOUT_SECONDS,
+    }
+    if settings.SMTP_TLS:
+        smtp_options["tls"] = True
+    elif settings.SMTP_SSL:
+        smtp_options["ssl"] = True
+    if settings.SMTP_USER:
+        smtp_options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        smtp_options["password"] = settings.SMTP_PASSWORD
+    return smtp_options
+
+
+class SMTPTransport:
+    """Connection pools keyed by the SMTP server options in effect."""
+
+    def __init__(self) -> None:
+        self._pools: dict[tuple[tuple[str, Any], ...], SMTPConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def pool(self) -> SMTPConnectionPool:
+        options = get_smtp_options()
+        key = tuple(sorted(options.items()))
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = SMTPConnectionPool(
+                    options,
+                    size=settings.SMTP_POOL_SIZE,
+                    idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT_SECONDS,
+                    health_check_after=settings.SMTP_POOL_HEALTH_CHECK_SECONDS,
+                )
+            return pool
+
+    @contextmanager
+    def session(self) -> Iterator[SMTPSession]:
+        """Check out a session to send a burst of messages over."""
+        assert settings.emails_enabled, "no provided configuration for email variables"
+        with self.pool().session() as session:
+            yield session
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+smtp_transport = SMTPTransport()
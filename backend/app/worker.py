@@ -0,0 +1,37 @@
+import logging
+import signal
+import threading
+from types import FrameType
+
+from app.core.email_outbox import email_outbox_worker
+from app.core.user_purge import user_purger
+from app.utils.smtp_transport import smtp_transport
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    stop = threading.Event()
+
+    def handle_signal(signum: int, _frame: FrameType | None) -> None:
+        logger.info(f"Received signal {signum}, stopping after the current batch")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    # Resumes user purges whose web worker died before finishing them
+    purger = threading.Thread(
+        target=user_purger.run_forever, args=(stop,), name="user-purger"
+    )
+    purger.start()
+    logger.info("Starting email outbox worker")
+    email_outbox_worker.run(stop)
+    purger.join()
+    smtp_transport.close()
+    logger.info("Email outbox worker stopped")
+
+
+if __name__ == "__main__":
+    main()